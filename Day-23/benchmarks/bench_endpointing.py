@@ -0,0 +1,134 @@
+# benchmarks/bench_endpointing.py
+"""
+Reports how much turn latency local endpointing saves, and how often it fires
+too early, against a local stand-in for AssemblyAI's streaming endpointing.
+
+The stand-in emits a cumulative partial shortly after every word and a final
+once it has seen PROVIDER_SILENCE_MS of trailing silence. The LocalEndpointer
+sees the same 50 ms frames and partials, in time order. A "false endpoint" is
+a local fire whose text the provider's final later extends (the speaker only
+paused).
+
+Run from the Day-23 folder, on 16-bit mono 16 kHz WAV recordings:
+    python benchmarks/bench_endpointing.py path/to/*.wav
+With no files, synthetic speech with mid-sentence hesitations is used.
+"""
+import argparse
+import os
+import sys
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.endpointing import LocalEndpointer  # noqa: E402
+from services.vad import VoiceActivityDetector  # noqa: E402
+
+SAMPLE_RATE = 16000
+FRAME_MS = 50
+PROVIDER_SILENCE_MS = 900
+PARTIAL_DELAY_MS = 150
+FINAL_DELAY_MS = 200
+
+
+def load_wav(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2 or w.getnchannels() != 1 or w.getframerate() != SAMPLE_RATE:
+            raise ValueError(f"{path}: expected 16-bit mono {SAMPLE_RATE} Hz PCM")
+        return np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+
+
+def synth_recording(rng: np.random.Generator, turns: int = 20) -> np.ndarray:
+    """Turns of 2-8 tone 'words'; one gap in ten is a hesitation."""
+    parts = [np.zeros(int(0.5 * SAMPLE_RATE))]
+    for _ in range(turns):
+        for w in range(rng.integers(2, 9)):
+            if w:
+                gap = rng.uniform(0.4, 0.9) if rng.random() < 0.1 else rng.uniform(0.06, 0.15)
+                parts.append(np.zeros(int(gap * SAMPLE_RATE)))
+            n = int(rng.uniform(0.2, 0.5) * SAMPLE_RATE)
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append(6000 * np.sin(2 * np.pi * rng.uniform(120, 240) * t))
+        parts.append(np.zeros(int(2.5 * SAMPLE_RATE)))
+    pcm = np.concatenate(parts) + rng.normal(0, 30, sum(len(p) for p in parts))
+    return pcm.astype("<i2")
+
+
+def frames_of(pcm: np.ndarray):
+    size = SAMPLE_RATE * FRAME_MS // 1000
+    for i in range(len(pcm) // size):
+        yield (i + 1) * FRAME_MS / 1000, pcm[i * size:(i + 1) * size].tobytes()
+
+
+def provider_events(pcm: np.ndarray, is_speech):
+    """Partials and finals the stand-in provider would emit, as (time, kind, text)."""
+    events = []
+    words, in_word, silence_ms = [], False, 0.0
+    for t, frame in frames_of(pcm):
+        if is_speech(frame):
+            in_word, silence_ms = True, 0.0
+            continue
+        if in_word:
+            in_word = False
+            words.append(f"word{len(events)}")
+            events.append((t + PARTIAL_DELAY_MS / 1000, "partial", " ".join(words)))
+        silence_ms += FRAME_MS
+        if words and silence_ms >= PROVIDER_SILENCE_MS:
+            events.append((t + FINAL_DELAY_MS / 1000, "final", " ".join(words)))
+            words = []
+    return events
+
+
+def run(pcm: np.ndarray, silence_ms: int, stable_ms: int) -> LocalEndpointer:
+    is_speech = VoiceActivityDetector(sample_rate=SAMPLE_RATE).is_speech
+    endpointer = LocalEndpointer(is_speech, silence_ms=silence_ms, stable_ms=stable_ms)
+
+    timeline = [(t, "audio", frame) for t, frame in frames_of(pcm)]
+    timeline += provider_events(pcm, is_speech)
+    # Audio sorts before provider events that land on the same instant
+    timeline.sort(key=lambda e: (e[0], e[1] != "audio"))
+
+    for t, kind, payload in timeline:
+        if kind == "audio":
+            endpointer.on_audio(payload, t)
+        elif kind == "partial":
+            endpointer.on_partial(payload, t)
+        else:
+            endpointer.on_final(payload, t)
+    return endpointer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("wav", nargs="*", help="16-bit mono 16 kHz WAV recordings")
+    parser.add_argument("--stable-ms", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    if args.wav:
+        recordings = [load_wav(p) for p in args.wav]
+    else:
+        rng = np.random.default_rng(args.seed)
+        recordings = [synth_recording(rng) for _ in range(5)]
+
+    print(f"Provider stand-in: {PROVIDER_SILENCE_MS} ms end-of-turn silence, +{FINAL_DELAY_MS} ms final delay")
+    print(f"{'silence_ms':>10}{'turns':>8}{'confirmed':>11}{'false eps':>11}{'false rate':>12}{'saved ms (mean)':>17}")
+    for silence_ms in (400, 600, 800):
+        totals = {"confirmed": 0, "corrected": 0, "unfired": 0}
+        saved = []
+        for pcm in recordings:
+            ep = run(pcm, silence_ms, args.stable_ms)
+            totals["confirmed"] += ep.confirmed
+            totals["corrected"] += ep.corrected
+            totals["unfired"] += ep.unfired
+            saved += ep.saved_ms
+        turns = sum(totals.values())
+        fired = totals["confirmed"] + totals["corrected"]
+        rate = totals["corrected"] / fired if fired else 0.0
+        mean_saved = float(np.mean(saved)) if saved else 0.0
+        print(f"{silence_ms:>10}{turns:>8}{totals['confirmed']:>11}{totals['corrected']:>11}{rate:>12.1%}{mean_saved:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/bench_mulaw.py
+"""
+Server-side cost of the mu-law uplink: decode time per second of audio,
+at the frame sizes the browser client sends.
+
+Run from the Day-23 folder:
+    python benchmarks/bench_mulaw.py
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.codec import decode_mulaw, encode_mulaw  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10.0, help="audio decoded per measurement")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pcm = (rng.normal(0, 4000, int(args.seconds * SAMPLE_RATE))).clip(-32768, 32767).astype("<i2").tobytes()
+    encoded = encode_mulaw(pcm)
+
+    print(f"Uplink: PCM16 {SAMPLE_RATE * 16 // 1000} kbps -> mu-law {SAMPLE_RATE * 8 // 1000} kbps")
+    print(f"{'frame':>12}{'us per audio second':>22}{'CPU share':>12}")
+    for frame_ms in (20, 50, 256):
+        size = SAMPLE_RATE * frame_ms // 1000
+        frames = [encoded[i:i + size] for i in range(0, len(encoded), size)]
+
+        def decode_all():
+            for frame in frames:
+                decode_mulaw(frame)
+
+        best = min(timeit.repeat(decode_all, number=1, repeat=args.repeat))
+        per_second_us = best / args.seconds * 1e6
+        print(f"{frame_ms:>9} ms{per_second_us:>22.1f}{per_second_us / 1e6:>12.4%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_reframing.py
+"""
+Measures how uplink framing affects end-of-turn latency, using a local
+stand-in for the streaming STT provider (no network).
+
+The stand-in classifies every frame it receives as speech or silence and
+ends the turn once it has seen END_OF_TURN_SILENCE_MS of trailing silence,
+which is how provider-side endpointing behaves. Audio is played through a
+simulated client that captures fixed-size blocks in real time, so the
+reported latency (speech end -> end of turn) includes capture delay.
+
+Run from the Day-23 folder:
+    python benchmarks/bench_reframing.py
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.framing import PCMReframer  # noqa: E402
+from services.vad import VoiceActivityDetector  # noqa: E402
+
+SAMPLE_RATE = 16000
+END_OF_TURN_SILENCE_MS = 400
+
+
+class LocalSTTStandIn:
+    """Frame-granular endpointing, like a streaming STT provider."""
+
+    def __init__(self, silence_ms: int = END_OF_TURN_SILENCE_MS):
+        self.silence_ms = silence_ms
+        self.detector = VoiceActivityDetector(sample_rate=SAMPLE_RATE)
+        self.trailing_silence_ms = 0.0
+        self.heard_speech = False
+
+    def stream(self, frame: bytes) -> bool:
+        """Consumes one frame; returns True when the turn ends."""
+        frame_ms = len(frame) / 2 / SAMPLE_RATE * 1000
+        if self.detector.is_speech(frame):
+            self.heard_speech = True
+            self.trailing_silence_ms = 0.0
+            return False
+        self.trailing_silence_ms += frame_ms
+        return self.heard_speech and self.trailing_silence_ms >= self.silence_ms
+
+
+def make_utterance(rng: np.random.Generator) -> (np.ndarray, float):
+    """Returns (pcm, speech_end_seconds): a little silence, a voiced tone, then silence."""
+    lead = rng.uniform(0.1, 0.5)
+    speech = rng.uniform(0.8, 2.5)
+    tail = 2.0
+    n = int((lead + speech + tail) * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    pcm = (rng.normal(0, 30, n)).astype(np.float32)
+    voiced = (t >= lead) & (t < lead + speech)
+    pcm[voiced] += 8000 * np.sin(2 * np.pi * 180 * t[voiced])
+    return pcm.astype("<i2"), lead + speech
+
+
+def end_of_turn_latency(pcm: np.ndarray, speech_end: float, block: int, frame_ms: int) -> float:
+    """Seconds from the end of speech until the stand-in ends the turn."""
+    stt = LocalSTTStandIn()
+    reframer = PCMReframer(frame_ms=frame_ms, sample_rate=SAMPLE_RATE) if frame_ms else None
+
+    for start in range(0, len(pcm) - block + 1, block):
+        # The client can only send a block once it has been fully captured
+        arrival = (start + block) / SAMPLE_RATE
+        data = pcm[start:start + block].tobytes()
+        for frame in (reframer.feed(data) if reframer is not None else [data]):
+            if stt.stream(frame):
+                return arrival - speech_end
+    return float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    utterances = [make_utterance(rng) for _ in range(args.trials)]
+
+    scenarios = [
+        ("ScriptProcessor 4096, no re-framing", 4096, 0),
+        ("ScriptProcessor 4096, 100 ms frames", 4096, 100),
+        ("ScriptProcessor 4096, 50 ms frames", 4096, 50),
+        ("AudioWorklet 20 ms, 50 ms frames", 320, 50),
+    ]
+
+    print(f"End-of-turn latency after speech ends ({END_OF_TURN_SILENCE_MS} ms provider silence rule)")
+    print(f"{'scenario':<40}{'mean ms':>10}{'p95 ms':>10}")
+    for name, block, frame_ms in scenarios:
+        lat = np.array([end_of_turn_latency(pcm, end, block, frame_ms) for pcm, end in utterances]) * 1000
+        print(f"{name:<40}{np.nanmean(lat):>10.0f}{np.nanpercentile(lat, 95):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
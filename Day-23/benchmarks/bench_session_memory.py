@@ -0,0 +1,86 @@
+# benchmarks/bench_session_memory.py
+"""
+Memory held by conversation histories at 10k sessions x 50 turns: the old
+list-of-dicts representation vs SessionStore's compact text buffer plus
+offsets. Also times rehydrating one history for an LLM call. (SDK Content
+objects are not measured: their protobuf storage lives outside the Python
+allocator, where tracemalloc cannot see it.)
+
+Run from the Day-23 folder:
+    python benchmarks/bench_session_memory.py [--sessions 10000] [--turns 50]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.sessions import SessionStore  # noqa: E402
+
+
+def user_text(s: int, t: int) -> str:
+    return f"Session {s} turn {t}: what is the weather like in the city today?"
+
+
+def model_text(s: int, t: int) -> str:
+    return (f"Reply {s}/{t}. It is mostly sunny with a light breeze, around twenty degrees. "
+            "Take a light jacket for the evening, when it gets cooler near the water.")
+
+
+def build_dicts(sessions: int, turns: int):
+    histories = {}
+    for s in range(sessions):
+        history = histories[f"session-{s}"] = []
+        for t in range(turns):
+            history.append({"role": "user", "parts": [user_text(s, t)]})
+            history.append({"role": "model", "parts": [model_text(s, t)]})
+    return histories
+
+
+def build_compact(sessions: int, turns: int):
+    store = SessionStore(max_sessions=sessions, max_bytes=1 << 62)
+    for s in range(sessions):
+        for t in range(turns):
+            store.append_turn(f"session-{s}", user_text(s, t), model_text(s, t))
+    return store
+
+
+def measure(build, sessions: int, turns: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = build(sessions, turns)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    text_bytes = sum(len(user_text(s, t).encode()) + len(model_text(s, t).encode())
+                     for s in range(args.sessions) for t in range(args.turns))
+    print(f"{args.sessions} sessions x {args.turns} turns, {text_bytes / 2**20:.1f} MiB of message text")
+    print(f"{'representation':>16}{'MiB held':>11}{'x text':>9}{'build s':>10}")
+
+    for name, build in (("dict lists", build_dicts), ("compact store", build_compact)):
+        held, current, elapsed = measure(build, args.sessions, args.turns)
+        print(f"{name:>16}{current / 2**20:>11.1f}{current / text_bytes:>9.2f}{elapsed:>10.2f}")
+        if isinstance(held, SessionStore):
+            start = time.perf_counter()
+            for _ in range(1000):
+                held.get_history("session-0")
+            print(f"{'':>16}rehydrating one {args.turns}-turn history: "
+                  f"{(time.perf_counter() - start) * 1000:.0f} us; store accounts {held.total_bytes / 2**20:.1f} MiB")
+        del held
+
+
+if __name__ == "__main__":
+    main()
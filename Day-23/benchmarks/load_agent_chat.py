@@ -0,0 +1,85 @@
+# benchmarks/load_agent_chat.py
+"""
+Load test for POST /agent/chat/{session_id}: fires N concurrent turns (one
+per session) at the app in-process with the fake providers, and reports the
+wall time of each batch against a single turn. With the async pipeline, N
+sessions should finish in roughly the time of one.
+
+By default the fakes sleep on the event loop, which shows the app's own
+ceiling. --blocking (or FAKE_BLOCKING=true) makes every provider call block
+a PROVIDER_THREADS worker like the real SDKs do; a turn's STT, LLM and TTS
+calls run one after another, so each turn holds one thread for about its
+whole duration and batches beyond PROVIDER_THREADS sessions queue for the
+pool. The report then adds that pool-limited floor for comparison.
+
+Needs httpx (pip install httpx). Run from the Day-23 folder:
+    python benchmarks/load_agent_chat.py --concurrency 1 10 50
+    PROVIDER_THREADS=8 python benchmarks/load_agent_chat.py --blocking --concurrency 1 8 16 32
+"""
+import argparse
+import asyncio
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for _name in ("STT_PROVIDER", "LLM_PROVIDER", "TTS_PROVIDER"):
+    os.environ.setdefault(_name, "fake")
+
+import httpx  # noqa: E402
+
+import config  # noqa: E402
+import main  # noqa: E402
+
+AUDIO = b"\x00\x00" * 16000  # the fake STT ignores the content
+
+
+def unique_audio(session_id: str) -> bytes:
+    # Distinct bytes per turn, so the transcript cache never short-circuits STT
+    return AUDIO + session_id.encode()
+
+
+async def one_turn(client: httpx.AsyncClient, session_id: str) -> float:
+    start = time.perf_counter()
+    response = await client.post(f"/agent/chat/{session_id}", files={"audio_file": ("turn.wav", unique_audio(session_id), "audio/wav")})
+    response.raise_for_status()
+    if response.headers.get("X-Error"):
+        raise RuntimeError(f"session {session_id} fell back to the error audio")
+    return time.perf_counter() - start
+
+
+async def run(concurrency_levels, blocking: bool):
+    threads = config.PROVIDER_THREADS
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        single = await one_turn(client, "load-warmup")
+        print(f"fakes {'blocking on ' + str(threads) + ' provider threads' if blocking else 'sleeping on the event loop'}; "
+              f"single turn {single:.2f} s")
+        if blocking:
+            print(f"pool ceiling: {threads / single:.1f} turns/s")
+        print(f"{'sessions':>9}{'wall s':>9}{'mean turn s':>13}{'max turn s':>12}{'x single':>10}{'turns/s':>9}"
+              + (f"{'pool floor s':>14}" if blocking else ""))
+        for n in concurrency_levels:
+            start = time.perf_counter()
+            turns = await asyncio.gather(*(one_turn(client, f"load-{n}-{i}") for i in range(n)))
+            wall = time.perf_counter() - start
+            floor = f"{math.ceil(n / threads) * single:>14.2f}" if blocking else ""
+            print(f"{n:>9}{wall:>9.2f}{sum(turns) / n:>13.2f}{max(turns):>12.2f}{wall / single:>10.2f}{n / wall:>9.1f}{floor}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--blocking", action="store_true", help="fakes block provider threads like the real SDKs")
+    args = parser.parse_args()
+    blocking = args.blocking or config.FAKE_BLOCKING
+    for provider in (main.stt_provider, main.llm_provider, main.tts_provider):
+        if hasattr(provider, "blocking"):
+            provider.blocking = blocking
+    asyncio.run(run(args.concurrency, blocking))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,272 @@
+# benchmarks/load_ws.py
+"""
+Load test for the /ws voice pipeline: ramps up concurrent sessions that
+stream PCM at real-time pace, and reports latency and server load per step.
+
+Each session plays an utterance (WAV files, or a synthetic one), then keeps
+streaming silence like an open mic until the reply's last audio arrives, for
+--turns turns. Per step it reports:
+  - TTFA: time to first audio, from the end of the user's speech (so it
+    includes endpointing: 700 ms of silence for the fake STT)
+  - turn: end of speech to the last audio of the reply
+  - server CPU (% of one core) and peak RSS, sampled from /proc
+
+By default the server is started with uvicorn and the fake providers
+(services/fakes.py) on a free port, so the numbers measure the server itself.
+Tune the stand-ins with --server-env, e.g. FAKE_FIRST_BYTE_S=0.4. The step
+where TTFA p95 passes --slo-ms or sessions fail is the single-worker ceiling.
+
+Needs websockets (pip install websockets). Run from the Day-23 folder:
+    python benchmarks/load_ws.py --ramp 1 10 25 50 --turns 2
+    python benchmarks/load_ws.py --wav samples/*.wav --server-env LOOP_MONITOR_ENABLED=true
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import wave
+
+import numpy as np
+import websockets
+
+DAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SENTENCE_SPLIT = re.compile(r'(?<=[.?!])\s+')  # as the server splits replies into audio messages
+
+
+def synthetic_utterance(sample_rate: int = 16000) -> np.ndarray:
+    # Two 300 ms "words" 100 ms apart: the fake STT counts speech bursts as words
+    t = np.arange(int(0.3 * sample_rate)) / sample_rate
+    word = (8000 * np.sin(2 * np.pi * 200 * t)).astype("<i2")
+    return np.concatenate([word, np.zeros(int(0.1 * sample_rate), "<i2"), word])
+
+
+def load_wav(path: str):
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), "<i2")
+        if wav.getnchannels() > 1:
+            samples = samples.reshape(-1, wav.getnchannels()).mean(axis=1).astype("<i2")
+        return samples, wav.getframerate()
+
+
+def frames_of(samples: np.ndarray, sample_rate: int, frame_ms: int):
+    step = sample_rate * frame_ms // 1000
+    return [samples[i:i + step].tobytes() for i in range(0, len(samples), step)]
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class ProcSampler:
+    """CPU and RSS of one process from /proc (Linux), sampled in the background."""
+
+    def __init__(self, pid: int, interval_s: float = 0.5):
+        self.pid = pid
+        self.interval_s = interval_s
+        self.ticks_per_s = os.sysconf("SC_CLK_TCK")
+        self.available = os.path.exists(f"/proc/{pid}/stat")
+
+    def _cpu_s(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.ticks_per_s  # utime + stime
+
+    def _rss_mb(self) -> float:
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+
+    async def measure(self, stop: asyncio.Event) -> dict:
+        if not self.available:
+            return {"cpu_pct": float("nan"), "rss_mb": float("nan")}
+        cpu0, t0, peak = self._cpu_s(), time.perf_counter(), self._rss_mb()
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval_s)
+            except asyncio.TimeoutError:
+                pass
+            peak = max(peak, self._rss_mb())
+        return {"cpu_pct": 100 * (self._cpu_s() - cpu0) / (time.perf_counter() - t0), "rss_mb": peak}
+
+
+class Turn:
+    def __init__(self):
+        self.speech_end = None
+        self.first_audio = None
+        self.last_audio = None
+        self.expected_audio = None
+        self.audio = 0
+        self.error = None
+        self.done = asyncio.Event()
+
+
+async def run_session(url: str, utterances, sample_rate: int, frame_ms: int, turns: int, timeout_s: float, start_delay_s: float):
+    await asyncio.sleep(start_delay_s)
+    frame_s = frame_ms / 1000
+    silence = bytes(len(utterances[0][0]))
+    results = []
+    current = None
+
+    async def receive(ws):
+        async for raw in ws:
+            message = json.loads(raw)
+            if current is None:
+                continue
+            kind = message.get("type")
+            if kind == "assistant":
+                current.expected_audio = len([s for s in SENTENCE_SPLIT.split(message["text"].strip()) if s.strip()])
+            elif kind == "audio":
+                now = time.perf_counter()
+                current.first_audio = current.first_audio or now
+                current.last_audio = now
+                current.audio += 1
+                if current.audio == current.expected_audio:
+                    current.done.set()
+            elif kind == "llm":  # the server's error reply
+                current.error = message.get("text")
+                current.done.set()
+
+    async with websockets.connect(url, max_size=None) as ws:
+        if sample_rate != 16000:
+            await ws.send(json.dumps({"type": "config", "codec": "pcm16", "sample_rate": sample_rate}))
+        receiver = asyncio.create_task(receive(ws))
+        next_send = time.perf_counter()
+        try:
+            for i in range(turns):
+                current = Turn()
+                # Real-time pace on an absolute schedule, so slow sends do not drift
+                for frame in utterances[i % len(utterances)]:
+                    await ws.send(frame)
+                    next_send += frame_s
+                    await asyncio.sleep(max(next_send - time.perf_counter(), 0))
+                current.speech_end = time.perf_counter()
+                deadline = current.speech_end + timeout_s
+                while not current.done.is_set():
+                    if time.perf_counter() > deadline:
+                        current.error = "timeout"
+                        break
+                    await ws.send(silence)
+                    next_send += frame_s
+                    try:
+                        await asyncio.wait_for(current.done.wait(), max(next_send - time.perf_counter(), 0))
+                    except asyncio.TimeoutError:
+                        pass
+                results.append(current)
+                if current.error:
+                    break
+        finally:
+            receiver.cancel()
+    return results
+
+
+def start_server(port: int, extra_env) -> subprocess.Popen:
+    env = dict(os.environ, STT_PROVIDER="fake", LLM_PROVIDER="fake", TTS_PROVIDER="fake")
+    env.update(extra_env)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=DAY_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(300):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/latency", timeout=1)
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("server exited during startup")
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not come up")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run(args):
+    if args.wav:
+        clips = [load_wav(path) for path in args.wav]
+        sample_rate = clips[0][1]
+        if any(rate != sample_rate for _, rate in clips):
+            raise SystemExit("all WAV files must share one sample rate")
+        utterances = [frames_of(samples, sample_rate, args.frame_ms) for samples, _ in clips]
+    else:
+        sample_rate = 16000
+        utterances = [frames_of(synthetic_utterance(), sample_rate, args.frame_ms)]
+
+    server = None
+    if args.url:
+        url, pid = args.url, args.server_pid
+    else:
+        port = free_port()
+        server = start_server(port, dict(item.split("=", 1) for item in args.server_env))
+        url, pid = f"ws://127.0.0.1:{port}/ws", server.pid
+
+    print(f"{'sessions':>9}{'turns':>7}{'failed':>8}{'ttfa p50':>10}{'p95':>7}{'p99':>7}"
+          f"{'turn p50':>10}{'p95':>7}{'p99':>7}{'cpu %':>8}{'rss MB':>8}")
+    ceiling = None
+    try:
+        for n in args.ramp:
+            stop = asyncio.Event()
+            sampler = asyncio.create_task(ProcSampler(pid).measure(stop)) if pid else None
+            sessions = await asyncio.gather(*(
+                run_session(url, utterances, sample_rate, args.frame_ms, args.turns, args.timeout_s, i * args.stagger_ms / 1000)
+                for i in range(n)
+            ), return_exceptions=True)
+            stop.set()
+            load = await sampler if sampler else {"cpu_pct": float("nan"), "rss_mb": float("nan")}
+
+            turns = [turn for s in sessions if not isinstance(s, BaseException) for turn in s]
+            ok = [turn for turn in turns if not turn.error]
+            failed = sum(isinstance(s, BaseException) for s in sessions) + len(turns) - len(ok)
+            ttfa = [(t.first_audio - t.speech_end) * 1000 for t in ok]
+            turn_ms = [(t.last_audio - t.speech_end) * 1000 for t in ok]
+            print(f"{n:>9}{len(ok):>7}{failed:>8}"
+                  f"{percentile(ttfa, .5):>10.0f}{percentile(ttfa, .95):>7.0f}{percentile(ttfa, .99):>7.0f}"
+                  f"{percentile(turn_ms, .5):>10.0f}{percentile(turn_ms, .95):>7.0f}{percentile(turn_ms, .99):>7.0f}"
+                  f"{load['cpu_pct']:>8.0f}{load['rss_mb']:>8.0f}")
+            if ceiling is None and (failed or not ok or percentile(ttfa, .95) > args.slo_ms):
+                ceiling = n
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    if ceiling is None:
+        print(f"\nTTFA p95 stayed under {args.slo_ms:.0f} ms up to {args.ramp[-1]} sessions.")
+    else:
+        print(f"\nCeiling: TTFA p95 over {args.slo_ms:.0f} ms or failed turns at {ceiling} sessions.")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ramp", type=int, nargs="+", default=[1, 10, 25, 50, 100], help="Concurrent sessions per step.")
+    parser.add_argument("--turns", type=int, default=2, help="Turns per session.")
+    parser.add_argument("--wav", nargs="*", help="16-bit WAV utterances, played in turn order (default: synthetic).")
+    parser.add_argument("--frame-ms", type=int, default=20)
+    parser.add_argument("--stagger-ms", type=float, default=20, help="Delay between session starts within a step.")
+    parser.add_argument("--timeout-s", type=float, default=30)
+    parser.add_argument("--slo-ms", type=float, default=2500, help="TTFA p95 budget used to report the ceiling.")
+    parser.add_argument("--server-env", nargs="*", default=[], metavar="KEY=VALUE", help="Extra env for the spawned server.")
+    parser.add_argument("--url", help="Target a running server (ws://host:port/ws) instead of spawning one.")
+    parser.add_argument("--server-pid", type=int, help="PID of the --url server, for CPU/RSS sampling.")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main_cli()
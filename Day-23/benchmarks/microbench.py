@@ -0,0 +1,300 @@
+# benchmarks/microbench.py
+"""
+Microbenchmarks for the CPU-bound pieces of a turn, checked against stored
+baselines so an optimization (or a regression) shows up as a number.
+
+Each case times one realistic unit of work (one reply, one audio message,
+one second of audio, one turn's history) with timeit, best of --repeat runs.
+Units that take well under a microsecond are repeated TINY_BATCH times per
+op (cases named *_x1000): timed alone they sit at the level of timeit's own
+loop overhead and swing by 20-30% between runs.
+Cases are compared by their time relative to a fixed reference loop timed
+right before them, so CPU throttling and busy neighbours cancel out. Results
+are compared with benchmarks/microbench_baseline.json; any case more than
+--threshold slower than its baseline, and still slower after --confirm
+re-measurements, fails the run (exit code 1). --save keeps the best of
+1 + --confirm runs per case.
+
+Baselines still depend on the CPU and Python version: record them with
+--save on the machine that runs the comparison. Run from the Day-23 folder:
+    python benchmarks/microbench.py                 # compare with the baseline
+    python benchmarks/microbench.py --save          # record a new baseline
+    python benchmarks/microbench.py --filter pcm    # only cases matching "pcm"
+"""
+import argparse
+import base64
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for _name in ("STT_PROVIDER", "LLM_PROVIDER", "TTS_PROVIDER"):
+    os.environ.setdefault(_name, "fake")
+
+import google.generativeai as genai  # noqa: E402
+
+import main  # noqa: E402
+from services import llm, tts  # noqa: E402
+from services.codec import decode_mulaw, encode_mulaw  # noqa: E402
+from services.fakes import FakeTTSProvider  # noqa: E402
+from services.framing import PCMReframer  # noqa: E402
+from services.resampler import StreamingResampler  # noqa: E402
+from services.sessions import SessionStore  # noqa: E402
+from services.vad import VoiceActivityDetector  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "microbench_baseline.json"
+SAMPLE_RATE = 16000
+
+# A typical reply: ~600 characters, six sentences
+REPLY = (
+    "Sure, here is a quick overview. Python lists can be reversed in place with the reverse method. "
+    "If you need a new list instead, use slicing with a step of minus one! Both run in linear time, "
+    "so pick whichever reads better in your code. Would you like an example with a list of strings? "
+    "I can also show how reversed works with any iterable, which avoids building a copy at all."
+)
+LLM_CHUNK_CHARS = 12  # as FAKE_LLM_CHUNK_CHARS
+TTS_CHUNK_BYTES = 4096  # as FAKE_TTS_CHUNK_BYTES
+HISTORY_TURNS = 50
+TINY_BATCH = 1000
+
+
+def _pcm(seconds: float, rate: int = SAMPLE_RATE) -> bytes:
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 3000, int(seconds * rate)).clip(-32768, 32767).astype("<i2").tobytes()
+
+
+def _blocks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _history(turns: int = HISTORY_TURNS):
+    history = []
+    for i in range(turns):
+        history = llm.append_turn(history, f"question {i}: how do I reverse a list in python", REPLY)
+    return history
+
+
+# --- Cases: each builds its inputs once and returns the callable to time -------
+
+def case_sentences_streamed():
+    """Split one reply into sentences as it streams in, like agent_chat_events."""
+    deltas = [REPLY[i:i + LLM_CHUNK_CHARS] for i in range(0, len(REPLY), LLM_CHUNK_CHARS)]
+
+    def run():
+        pending, out = "", []
+        for delta in deltas:
+            *complete, pending = main.SENTENCE_END.split(pending + delta)
+            out.extend(s.strip() for s in complete if s.strip())
+        return out
+    return run
+
+
+def case_sentences_whole_reply():
+    """Split one complete reply into sentences, like the /ws handler."""
+    return lambda: [s for s in re.split(r'(?<=[.?!])\s+', REPLY.strip()) if s.strip()]
+
+
+def case_audio_message_ws():
+    """Base64 + JSON for one sentence of audio sent over /ws (Starlette's send_json encoding)."""
+    audio = FakeTTSProvider().synthesize("Python lists can be reversed in place with the reverse method.")
+
+    def run():
+        b64_audio = base64.b64encode(audio).decode("utf-8")
+        return json.dumps({"type": "audio", "b64": b64_audio}, separators=(",", ":"), ensure_ascii=False)
+    return run
+
+
+def case_audio_event_ndjson():
+    """Base64 + JSON for one audio event of the streaming /agent/chat response."""
+    audio = FakeTTSProvider().synthesize("Python lists can be reversed in place with the reverse method.")
+    return lambda: json.dumps({"type": "audio", "index": 0, "b64": base64.b64encode(audio).decode("utf-8")}) + "\n"
+
+
+def case_pcm_reframe():
+    """Re-frame 1 s of 4096-sample client blocks into 20 ms provider frames."""
+    blocks = _blocks(_pcm(1.0), 4096 * 2)
+
+    def run():
+        reframer = PCMReframer(frame_ms=20)
+        for block in blocks:
+            reframer.feed(block)
+    return run
+
+
+def case_pcm_mulaw_decode():
+    """Decode 1 s of mu-law uplink in 20 ms frames."""
+    frames = _blocks(encode_mulaw(_pcm(1.0)), 320)
+    return lambda: [decode_mulaw(frame) for frame in frames]
+
+
+def case_pcm_resample_48k():
+    """Resample 1 s of 48 kHz uplink to 16 kHz in 20 ms blocks."""
+    blocks = _blocks(_pcm(1.0, 48000), 960 * 2)
+
+    def run():
+        resampler = StreamingResampler(48000, 16000)
+        for block in blocks:
+            resampler.process(block)
+    return run
+
+
+def case_pcm_vad():
+    """Speech/silence decisions for 1 s of 20 ms frames."""
+    frames = _blocks(_pcm(1.0), 640)
+    vad = VoiceActivityDetector()
+    return lambda: [vad.is_speech(frame) for frame in frames]
+
+
+def case_history_append_turn():
+    """Extend a 50-turn history with one exchange (llm.append_turn), TINY_BATCH times."""
+    history = _history()
+
+    def run():
+        for _ in range(TINY_BATCH):
+            llm.append_turn(history, "and how about tuples?", REPLY)
+    return run
+
+
+def case_history_load_session():
+    """Rehydrate a 50-turn /agent/chat session from the in-memory store."""
+    store = SessionStore()
+    for i in range(HISTORY_TURNS):
+        store.append_turn("bench", f"question {i}: how do I reverse a list in python", REPLY)
+    return lambda: store.get_history("bench")
+
+
+def case_history_correction_trim():
+    """Drop an early-fired turn from a 50-turn /ws history (local endpointing correction), TINY_BATCH times."""
+    history = _history()
+    keep = len(history) - 2
+
+    def run():
+        for _ in range(TINY_BATCH):
+            chat_history = list(history)
+            del chat_history[keep:]
+    return run
+
+
+def case_prompt_assembly():
+    """Build the Gemini chat for a 50-turn history, as get_llm_response does before each call."""
+    history = _history()
+    return lambda: genai.GenerativeModel("gemini-1.5-flash", system_instruction=llm.system_instructions).start_chat(history=history)
+
+
+def case_tts_speak_accumulate():
+    """tts.speak over ~200 KB of audio in 4 KB chunks, with a local stream in place of Murf."""
+    audio = bytes(200 * 1024)
+    uploads = Path(tempfile.mkdtemp(prefix="microbench-"))
+
+    class _LocalStream:
+        def __init__(self, api_key=None):
+            self.text_to_speech = self
+
+        def stream(self, **kwargs):
+            return iter(_blocks(audio, TTS_CHUNK_BYTES))
+
+    def run():
+        murf, uploads_dir = tts.Murf, tts.UPLOADS_DIR
+        tts.Murf, tts.UPLOADS_DIR = _LocalStream, uploads
+        try:
+            return tts.speak("benchmark sentence")
+        finally:
+            tts.Murf, tts.UPLOADS_DIR = murf, uploads_dir
+    return run
+
+
+CASES = {
+    "sentences.streamed": case_sentences_streamed,
+    "sentences.whole_reply": case_sentences_whole_reply,
+    "audio_message.ws_json": case_audio_message_ws,
+    "audio_message.ndjson_event": case_audio_event_ndjson,
+    "pcm.reframe_1s": case_pcm_reframe,
+    "pcm.mulaw_decode_1s": case_pcm_mulaw_decode,
+    "pcm.resample_48k_1s": case_pcm_resample_48k,
+    "pcm.vad_1s": case_pcm_vad,
+    "history.append_turn_x1000": case_history_append_turn,
+    "history.load_session": case_history_load_session,
+    "history.correction_trim_x1000": case_history_correction_trim,
+    "history.prompt_assembly": case_prompt_assembly,
+    "tts.speak_accumulate": case_tts_speak_accumulate,
+}
+
+
+def reference():
+    # Fixed mix of interpreter and C work; cases are scored relative to it
+    total = 0
+    for i in range(1000):
+        total += i * i
+    return json.dumps([total] * 100)
+
+
+def measure(fn, repeat: int) -> float:
+    """Best-of-`repeat` time per call in microseconds."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()  # enough calls for ~0.2 s per run
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def score(fn, repeat: int):
+    """Time per call, and that time in units of reference() timed right before it."""
+    reference_us = measure(reference, 3)
+    us = measure(fn, repeat)
+    return us, us / reference_us
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--save", action="store_true", help="record the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--confirm", type=int, default=2, help="re-measurements before a slow case counts as regressed (with --save: extra runs, best kept)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())["cases"] if args.baseline.exists() else {}
+    results, regressions = {}, []
+    print(f"{'case':<30}{'us/op':>12}{'baseline':>12}{'change':>9}")
+    for name, make in CASES.items():
+        if args.filter not in name:
+            continue
+        fn = make()
+        us, relative = score(fn, args.repeat)
+        base = baseline.get(name)
+        for _ in range(args.confirm if base or args.save else 0):
+            # A new baseline keeps the best of every run, like a comparison that needed confirming
+            if not args.save and relative <= base["relative"] * (1 + args.threshold):
+                break
+            us, relative = min((us, relative), score(fn, args.repeat), key=lambda r: r[1])
+        results[name] = {"us": round(us, 2), "relative": round(relative, 4)}
+        change = f"{(relative / base['relative'] - 1) * 100:+.1f}%" if base else "new"
+        flag = ""
+        if base and relative > base["relative"] * (1 + args.threshold):
+            regressions.append(name)
+            flag = "  REGRESSED"
+        print(f"{name:<30}{us:>12.1f}{base['us'] if base else float('nan'):>12.1f}{change:>9}{flag}")
+
+    if args.save:
+        saved = {**baseline, **results}
+        args.baseline.write_text(json.dumps({
+            "machine": f"{platform.machine()} / {platform.processor() or platform.system()}",
+            "python": platform.python_version(),
+            "unit": "us: microseconds per op (best of runs); relative: us / reference() us",
+            "cases": {name: saved[name] for name in sorted(saved)},
+        }, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} case(s) more than {args.threshold:.0%} slower than baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,135 @@
+# benchmarks/replay_session.py
+"""
+Replays a recorded /ws session against a fresh server and compares each
+turn's stage latencies with the original.
+
+Record sessions by running the server with SESSION_RECORD_DIR set. The
+replay starts uvicorn with the replay providers (STT/LLM/TTS answer with
+the recorded results after the recorded delays) and the recorded session
+settings (VAD, framing, endpointing). It then sends the recorded client
+frames at their original offsets. The replay server records the session
+too, so the turns can be compared stage by stage. Provider timings are
+held fixed, so any difference comes from the server.
+
+Run from the Day-23 folder:
+    python benchmarks/replay_session.py recordings/20250101-120000-ab12cd34.vrec
+    python benchmarks/replay_session.py session.vrec --tolerance-pct 20 --tolerance-ms 50
+"""
+import argparse
+import asyncio
+import glob
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import websockets
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_ws import free_port, start_server  # noqa: E402
+from services import recording  # noqa: E402
+
+
+def describe(path: str, meta: dict, records) -> None:
+    kinds = Counter(recording.KIND_NAMES[r.kind] for r in records)
+    duration = max((r.t for r in records), default=0.0)
+    print(f"{path}: {os.path.getsize(path) / 1024:.0f} KiB, {duration:.1f} s, "
+          f"providers {meta['stt_provider']}/{meta['llm_provider']}/{meta['tts_provider']}")
+    print("  " + ", ".join(f"{name}={n}" for name, n in sorted(kinds.items())))
+
+
+async def drive(url: str, records, tail_s: float):
+    """Sends the recorded client input at its original offsets, draining server messages meanwhile."""
+    inbound = [r for r in records if r.kind in (recording.AUDIO_IN, recording.TEXT_IN)]
+    end_t = max(r.t for r in records) + tail_s
+
+    async with websockets.connect(url, max_size=None) as ws:
+        async def drain():
+            async for _ in ws:
+                pass
+
+        receiver = asyncio.create_task(drain())
+        t0 = time.perf_counter()
+        for r in inbound:
+            await asyncio.sleep(max(t0 + r.t - time.perf_counter(), 0))
+            await ws.send(r.payload if r.kind == recording.AUDIO_IN else r.text())
+        await asyncio.sleep(max(t0 + end_t - time.perf_counter(), 0))
+        receiver.cancel()
+
+
+def turns_of(records):
+    return [r.json() for r in records if r.kind == recording.TURN]
+
+
+def compare(original, replayed, tolerance_pct, tolerance_ms) -> int:
+    """Prints a per-turn, per-stage comparison; returns the number of stages over tolerance."""
+    if len(original) != len(replayed):
+        print(f"Turn count differs: {len(original)} recorded, {len(replayed)} replayed")
+    over = 0
+    print(f"{'turn':>5}  {'stage':<22}{'recorded':>10}{'replayed':>10}{'delta ms':>10}{'delta':>9}")
+    for i, (a, b) in enumerate(zip(original, replayed), 1):
+        if a["status"] != b["status"]:
+            print(f"{i:>5}  status {a['status']} -> {b['status']}")
+        for stage, before in a["stages_ms"].items():
+            after = b["stages_ms"].get(stage)
+            if after is None:
+                print(f"{i:>5}  {stage:<22}{before:>10.1f}{'-':>10}")
+                continue
+            delta = after - before
+            pct = delta / before * 100 if before else 0.0
+            flag = ""
+            if tolerance_pct is not None and pct > tolerance_pct and delta > tolerance_ms:
+                over += 1
+                flag = "  SLOWER"
+            print(f"{i:>5}  {stage:<22}{before:>10.1f}{after:>10.1f}{delta:>+10.1f}{pct:>+8.1f}%{flag}")
+    return over
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("recording", help="a .vrec file written with SESSION_RECORD_DIR")
+    parser.add_argument("--tail-s", type=float, default=3.0, help="keep the session open this long after the last record")
+    parser.add_argument("--server-env", nargs="*", default=[], metavar="KEY=VALUE", help="extra env for the replay server")
+    parser.add_argument("--tolerance-pct", type=float, help="fail if a stage is this much slower than recorded ...")
+    parser.add_argument("--tolerance-ms", type=float, default=50.0, help="... and at least this many ms slower")
+    args = parser.parse_args()
+
+    meta, records = recording.read_recording(args.recording)
+    describe(args.recording, meta, records)
+    original = turns_of(records)
+    if not original:
+        raise SystemExit("The recording has no completed turns to compare.")
+
+    out_dir = tempfile.mkdtemp(prefix="replay-")
+    env = {
+        **meta["settings"],
+        "STT_PROVIDER": "replay", "LLM_PROVIDER": "replay", "TTS_PROVIDER": "replay",
+        "REPLAY_FILE": os.path.abspath(args.recording),
+        "SESSION_RECORD_DIR": out_dir,
+    }
+    env.update(item.split("=", 1) for item in args.server_env)
+    port = free_port()
+    server = start_server(port, env)
+    try:
+        asyncio.run(drive(f"ws://127.0.0.1:{port}/ws", records, args.tail_s))
+        time.sleep(1.0)  # the server closes its recording when it sees the disconnect
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    replays = sorted(glob.glob(os.path.join(out_dir, "*.vrec")))
+    if not replays:
+        raise SystemExit("The replay server wrote no recording.")
+    replay_meta, replayed_records = recording.read_recording(replays[-1])
+    describe(replays[-1], replay_meta, replayed_records)
+    print()
+    over = compare(original, turns_of(replayed_records), args.tolerance_pct, args.tolerance_ms)
+    if over:
+        print(f"\n{over} stage(s) slower than recorded beyond tolerance.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,5 +1,6 @@
 # config.py
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 import assemblyai as aai
 import google.generativeai as genai
@@ -8,6 +9,9 @@ import logging
 # Load environment variables from .env file
 load_dotenv()
 
+# Relative file paths in settings are resolved against the app folder, not the CWD
+BASE_DIR = Path(__file__).resolve().parent
+
 # Load API Keys from environment
 MURF_API_KEY = os.getenv("MURF_API_KEY")
 ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
@@ -25,4 +29,104 @@ else:
     logging.warning("GEMINI_API_KEY not found in .env file.")
 
 if not MURF_API_KEY:
-    logging.warning("MURF_API_KEY not found in .env file.")
\ No newline at end of file
+    logging.warning("MURF_API_KEY not found in .env file.")
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+# Voice activity detection in front of STT streaming (opt-in)
+VAD_ENABLED = _env_flag("VAD_ENABLED")
+VAD_ENERGY_THRESHOLD_DB = float(os.getenv("VAD_ENERGY_THRESHOLD_DB", "-45"))
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "1000"))
+VAD_PREROLL_MS = int(os.getenv("VAD_PREROLL_MS", "300"))
+VAD_KEEPALIVE_MS = int(os.getenv("VAD_KEEPALIVE_MS", "2000"))
+
+# Uplink re-framing: PCM is re-chunked to this frame size before STT (0 disables)
+STT_FRAME_MS = int(os.getenv("STT_FRAME_MS", "50"))
+
+# Bounded STT send queue per session (frames); the oldest silence is dropped first on overflow
+STT_SEND_QUEUE_FRAMES = int(os.getenv("STT_SEND_QUEUE_FRAMES", "100"))
+
+# Local endpointing: fire turns on trailing silence + a stable partial, before the provider (opt-in)
+LOCAL_ENDPOINTING_ENABLED = _env_flag("LOCAL_ENDPOINTING_ENABLED")
+ENDPOINT_SILENCE_MS = int(os.getenv("ENDPOINT_SILENCE_MS", "600"))
+ENDPOINT_STABLE_MS = int(os.getenv("ENDPOINT_STABLE_MS", "300"))
+
+# Batch file-transcription jobs (a job still processing after JOB_MAX_POLL_S is failed)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))
+JOB_POLL_INITIAL_S = float(os.getenv("JOB_POLL_INITIAL_S", "1.0"))
+JOB_POLL_MAX_S = float(os.getenv("JOB_POLL_MAX_S", "10.0"))
+JOB_MAX_POLL_S = float(os.getenv("JOB_MAX_POLL_S", "1800"))
+JOB_RESULT_TTL_S = float(os.getenv("JOB_RESULT_TTL_S", "3600"))
+
+# Pipeline providers: real services, deterministic local fakes for offline perf work,
+# or "replay" to play back the session recording in REPLAY_FILE
+STT_PROVIDER = os.getenv("STT_PROVIDER", "assemblyai").lower()
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+TTS_PROVIDER = os.getenv("TTS_PROVIDER", "murf").lower()
+REPLAY_FILE = os.getenv("REPLAY_FILE", "")
+
+# Tuning for the fake providers; FAKE_BLOCKING makes their async calls block a
+# PROVIDER_THREADS worker like the real SDKs instead of sleeping on the event loop
+FAKE_BLOCKING = _env_flag("FAKE_BLOCKING")
+FAKE_LATENCY_S = float(os.getenv("FAKE_LATENCY_S", "0.3"))
+FAKE_FIRST_BYTE_S = float(os.getenv("FAKE_FIRST_BYTE_S", "0.2"))
+FAKE_CHUNK_INTERVAL_S = float(os.getenv("FAKE_CHUNK_INTERVAL_S", "0.02"))
+FAKE_ERROR_RATE = float(os.getenv("FAKE_ERROR_RATE", "0"))
+FAKE_SEED = int(os.getenv("FAKE_SEED", "0"))
+FAKE_LLM_CHUNK_CHARS = int(os.getenv("FAKE_LLM_CHUNK_CHARS", "12"))
+FAKE_TTS_CHUNK_BYTES = int(os.getenv("FAKE_TTS_CHUNK_BYTES", "4096"))
+
+# /agent/chat: provider thread pool size and per-stage timeouts (seconds)
+PROVIDER_THREADS = int(os.getenv("PROVIDER_THREADS", "32"))
+STT_TIMEOUT_S = float(os.getenv("STT_TIMEOUT_S", "30"))
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "30"))
+TTS_TIMEOUT_S = float(os.getenv("TTS_TIMEOUT_S", "30"))
+
+# /voices catalog cache: fresh for VOICES_CACHE_TTL_S, then served stale while refreshing
+VOICES_CACHE_TTL_S = float(os.getenv("VOICES_CACHE_TTL_S", "3600"))
+VOICES_STALE_S = float(os.getenv("VOICES_STALE_S", "86400"))
+
+# Stream remote TTS audio through /audio/stream, optionally writing it through to disk
+AUDIO_PROXY_ENABLED = _env_flag("AUDIO_PROXY_ENABLED", "true")
+AUDIO_PROXY_CACHE = _env_flag("AUDIO_PROXY_CACHE", "true")
+AUDIO_PROXY_CHUNK_BYTES = int(os.getenv("AUDIO_PROXY_CHUNK_BYTES", "65536"))
+AUDIO_PROXY_MAX_CACHED = int(os.getenv("AUDIO_PROXY_MAX_CACHED", "10000"))
+# Key that signs /audio/stream links; every worker (and host) serving them must share it.
+# Unset, one is generated in AUDIO_PROXY_KEY_FILE, shared by the workers on this host.
+AUDIO_PROXY_SECRET = os.getenv("AUDIO_PROXY_SECRET", "")
+AUDIO_PROXY_KEY_FILE = str(BASE_DIR / os.getenv("AUDIO_PROXY_KEY_FILE", "uploads/.audio_proxy_key"))
+
+# Bounded on-disk audio store (uploads/audio): total size quota, idle age limit, sweep period
+AUDIO_STORE_MAX_MB = int(os.getenv("AUDIO_STORE_MAX_MB", "512"))
+AUDIO_STORE_MAX_AGE_S = float(os.getenv("AUDIO_STORE_MAX_AGE_S", "86400"))
+AUDIO_STORE_SWEEP_S = float(os.getenv("AUDIO_STORE_SWEEP_S", "60"))
+
+# Transcripts of uploaded audio, cached by content hash
+TRANSCRIPT_CACHE_TTL_S = float(os.getenv("TRANSCRIPT_CACHE_TTL_S", "86400"))
+TRANSCRIPT_CACHE_MAX = int(os.getenv("TRANSCRIPT_CACHE_MAX", "10000"))
+
+# POST /tts/batch: max items per request and max concurrent synthesis calls
+TTS_BATCH_MAX_ITEMS = int(os.getenv("TTS_BATCH_MAX_ITEMS", "500"))
+TTS_BATCH_CONCURRENCY = int(os.getenv("TTS_BATCH_CONCURRENCY", "8"))
+
+# /agent/chat session histories: "sqlite" (shared by all workers on the host) or "memory",
+# plus idle TTL, session cap and (memory backend) approximate memory budget
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite").lower()
+SESSION_DB_PATH = str(BASE_DIR / os.getenv("SESSION_DB_PATH", "uploads/sessions.db"))
+SESSION_IDLE_TTL_S = float(os.getenv("SESSION_IDLE_TTL_S", "1800"))
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+SESSION_MAX_MB = int(os.getenv("SESSION_MAX_MB", "256"))
+
+# Event loop watchdog (opt-in): samples loop lag every LOOP_MONITOR_INTERVAL_MS and
+# captures the loop thread's stack when a callback blocks longer than LOOP_BLOCK_THRESHOLD_MS
+LOOP_MONITOR_ENABLED = _env_flag("LOOP_MONITOR_ENABLED")
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+LOOP_STALLS_KEPT = int(os.getenv("LOOP_STALLS_KEPT", "50"))
+
+# Session recording (opt-in): /ws sessions are recorded here for replay (empty disables)
+SESSION_RECORD_DIR = os.getenv("SESSION_RECORD_DIR", "")
@@ -1,11 +1,20 @@
 # main.py
-from fastapi import FastAPI, Request, WebSocket
+from fastapi import FastAPI, Request, WebSocket, UploadFile, File, Path, Query
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from contextlib import asynccontextmanager
+from pathlib import Path as PathLib
+from typing import Optional
+from uuid import uuid4
 import logging
 import asyncio
 import base64
+import hashlib
+import json
+import os
 import re
+import time
 
 
 # Reduce uvicorn logging noise
@@ -21,22 +30,586 @@ asyncio.get_event_loop().set_exception_handler(
 
 # Import services and config
 import config
-from services import stt, llm, tts
+from services import codec, metrics, stt, providers
+from services.metrics import provider_call
+from services.audio_proxy import AudioProxy, load_or_create_key
+from services.audio_store import AudioStore
+from services.cache import AsyncTTLCache
+from services.endpointing import LocalEndpointer
+from services.executors import CountingExecutor
+from services.framing import PCMReframer
+from services.jobs import JobQueueFull, TranscriptionJobService
+from services.llm import append_turn
+from services.loop_monitor import LoopMonitor
+from services.uploads import save_upload
+from services.recording import SessionRecorder
+from services.resampler import StreamingResampler
+from services.sessions import get_session_backend
+from services.tracing import Tracer
+from services.vad import VoiceActivityDetector
+from schemas import TTSBatchRequest
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Process startup/shutdown: the counted default executor, the loop watchdog, queued session writes."""
+    global default_executor
+    loop = asyncio.get_running_loop()
+    default_executor = CountingExecutor(thread_name_prefix="default")
+    loop.set_default_executor(default_executor)
+    if loop_monitor is not None:
+        loop_monitor.start()
+    try:
+        yield
+    finally:
+        if loop_monitor is not None:
+            loop_monitor.stop()
+        # Session writes may still be queued behind the last turns
+        await sessions.close()
+        await loop.shutdown_default_executor()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Pipeline providers, selected by STT_PROVIDER / LLM_PROVIDER / TTS_PROVIDER
+stt_provider = providers.get_stt_provider()
+llm_provider = providers.get_llm_provider()
+tts_provider = providers.get_tts_provider()
 
 # Mount static files for CSS/JS
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# Uploaded files waiting for batch transcription
+BASE_DIR = PathLib(__file__).resolve().parent
+JOB_UPLOADS_DIR = BASE_DIR / "uploads" / "jobs"
+JOB_UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+TURN_UPLOADS_DIR = BASE_DIR / "uploads" / "turns"
+TURN_UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+
+# /agent/chat histories, selected by SESSION_BACKEND and bounded by idle TTL and session count
+sessions = get_session_backend()
+FALLBACK_AUDIO_PATH = BASE_DIR / "static" / "fallback.mp3"
+
+# Generated audio on disk, content-addressed and kept under a size/age quota
+audio_store = AudioStore(
+    BASE_DIR / "uploads" / "audio",
+    max_bytes=config.AUDIO_STORE_MAX_MB * 1024 * 1024,
+    max_age_s=config.AUDIO_STORE_MAX_AGE_S,
+    sweep_interval_s=config.AUDIO_STORE_SWEEP_S,
+)
+
+# Remote TTS audio is streamed to clients through our own origin
+audio_proxy = AudioProxy(
+    key=config.AUDIO_PROXY_SECRET.encode() or load_or_create_key(PathLib(config.AUDIO_PROXY_KEY_FILE)),
+    store=audio_store if config.AUDIO_PROXY_CACHE else None,
+    chunk_size=config.AUDIO_PROXY_CHUNK_BYTES,
+    max_cached=config.AUDIO_PROXY_MAX_CACHED,
+)
+
+# Transcripts keyed by the SHA-256 of the uploaded audio, so retried uploads skip the provider
+transcript_cache = AsyncTTLCache(ttl_s=config.TRANSCRIPT_CACHE_TTL_S, max_entries=config.TRANSCRIPT_CACHE_MAX)
+
+# Per-turn latency traces and stage histograms for /ws and /agent/chat
+tracer = Tracer()
+
+# STT send queues of open /ws sessions, for the queue depth gauge
+live_send_queues = set()
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-flight
+background_tasks = set()
+
+# Murf voice catalog: rarely changes, so serve it from memory and refresh in the background
+voices_cache = AsyncTTLCache(ttl_s=config.VOICES_CACHE_TTL_S, stale_s=config.VOICES_STALE_S, max_entries=1)
+
+transcription_jobs = TranscriptionJobService(
+    submit_fn=stt_provider.submit_transcription,
+    poll_fn=stt_provider.get_transcription,
+    workers=config.JOB_WORKERS,
+    max_pending=config.JOB_MAX_PENDING,
+    poll_initial_s=config.JOB_POLL_INITIAL_S,
+    poll_max_s=config.JOB_POLL_MAX_S,
+    max_poll_s=config.JOB_MAX_POLL_S,
+    result_ttl_s=config.JOB_RESULT_TTL_S,
+)
+
+# The loop's default executor (run_in_executor(None, ...), e.g. STT uplink sends), counted for /metrics;
+# installed by lifespan() for each run of the app
+default_executor = CountingExecutor(thread_name_prefix="default")
+
+# Opt-in event loop watchdog: lag histogram plus stacks of callbacks that block the loop
+loop_monitor = LoopMonitor(
+    interval_ms=config.LOOP_MONITOR_INTERVAL_MS,
+    threshold_ms=config.LOOP_BLOCK_THRESHOLD_MS,
+    max_stalls=config.LOOP_STALLS_KEPT,
+) if config.LOOP_MONITOR_ENABLED else None
+
+# Scrape-time metrics: stage latency, queue depth and worker pool saturation
+metrics.HistogramMetric(
+    "voice_turn_stage_seconds",
+    "Per-turn stage latency by path (ws, agent_chat, agent_chat_stream).",
+    ("path", "stage"),
+    source=lambda: tracer.histograms,
+    scale=0.001,
+)
+metrics.Gauge(
+    "voice_queue_depth",
+    "Items waiting in a queue: STT uplink frames summed over open /ws sessions, pending transcription jobs.",
+    ("queue",),
+    fn=lambda: {
+        ("stt_send",): sum(queue.depth for queue in list(live_send_queues)),
+        ("transcription_jobs",): transcription_jobs.queue_depth(),
+    },
+)
+metrics.Gauge(
+    "voice_executor",
+    "Worker pool saturation: queued calls, running calls and max threads.",
+    ("pool", "state"),
+    fn=metrics.executor_gauges({
+        "provider": providers.executor_stats,
+        "stt_job": transcription_jobs.executor_stats,
+        "default": lambda: default_executor.stats(),
+    }),
+)
+if loop_monitor is not None:
+    metrics.HistogramMetric(
+        "voice_event_loop_lag_seconds",
+        "How late the event loop ran a timer scheduled every LOOP_MONITOR_INTERVAL_MS.",
+        (),
+        source=lambda: {(): loop_monitor.lag},
+        scale=0.001,
+    )
+    metrics.Counter(
+        "voice_event_loop_stalls_total",
+        "Times a callback blocked the event loop longer than LOOP_BLOCK_THRESHOLD_MS.",
+        fn=lambda: {(): loop_monitor.stalls},
+    )
+
 
 @app.get("/")
 async def home(request: Request):
     """Serves the main HTML page."""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
+
+
+@app.post("/agent/chat/{session_id}")
+async def agent_chat(
+    session_id: str = Path(..., description="The unique ID for the chat session."),
+    audio_file: UploadFile = File(...),
+    stream: Optional[str] = Query(None, description="'ndjson' or 'sse' to stream events as they happen."),
+):
+    """
+    Handles a turn in the conversation, including history.
+    STT -> LLM -> TTS, each stage awaited with its own timeout so a slow
+    provider never holds up other sessions.
+    """
+    trace = tracer.start("agent_chat_stream" if stream in ("ndjson", "sse") else "agent_chat", session_id)
+    if stream in ("ndjson", "sse"):
+        media_type = "application/x-ndjson" if stream == "ndjson" else "text/event-stream"
+        return StreamingResponse(
+            agent_chat_events(session_id, audio_file, stream, trace),
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    try:
+        with provider_call("stt"):
+            user_query_text = await asyncio.wait_for(transcribe_upload(audio_file), config.STT_TIMEOUT_S)
+        trace.mark("stt_final")
+        logging.info(f"[{session_id}] User: {user_query_text}")
+
+        session_history = await sessions.load(session_id)
+        with provider_call("llm"):
+            llm_response_text, updated_history = await asyncio.wait_for(
+                llm_provider.aget_llm_response(user_query_text, session_history), config.LLM_TIMEOUT_S
+            )
+        trace.mark("llm_first_token")
+        logging.info(f"[{session_id}] Assistant: {llm_response_text}")
+        # Providers return the history unchanged when the LLM call failed
+        if len(updated_history) > len(session_history):
+            await sessions.append(session_id, user_query_text, llm_response_text)
+
+        with provider_call("tts"):
+            audio_url = await asyncio.wait_for(tts_provider.aconvert_text_to_speech(llm_response_text), config.TTS_TIMEOUT_S)
+        if audio_url:
+            trace.mark_audio_sent()
+            trace.finish()
+            return JSONResponse(content={"audio_url": proxied_audio_url(audio_url)})
+        raise RuntimeError("TTS service did not return an audio file.")
+
+    except asyncio.TimeoutError:
+        logging.error(f"[{session_id}] Stage timed out; returning fallback audio.")
+        trace.finish("timeout")
+    except Exception as e:
+        logging.error(f"[{session_id}] Error in agent chat: {e}")
+        trace.finish("error")
+    return FileResponse(FALLBACK_AUDIO_PATH, media_type="audio/mpeg", headers={"X-Error": "true"})
+
+
+async def transcribe_upload(audio_file: UploadFile) -> str:
+    """
+    Transcribes an /agent/chat upload through the transcript cache. The body is
+    copied to a temp file while it is hashed (one pass, constant memory), and a
+    cache miss transcribes that copy: the shared load never reads the request's
+    own file, which FastAPI closes if the first caller goes away.
+    """
+    path = TURN_UPLOADS_DIR / f"{uuid4().hex}{PathLib(audio_file.filename or '').suffix}"
+    claimed = False
+
+    async def transcribe_copy():
+        try:
+            with open(path, "rb") as f:
+                return await stt_provider.atranscribe_audio(UploadFile(f, filename=audio_file.filename))
+        finally:
+            path.unlink(missing_ok=True)
+
+    def load():
+        nonlocal claimed
+        claimed = True  # the load owns the copy from here on
+        return transcribe_copy()
+
+    try:
+        audio_hash = await providers.run_blocking(save_upload, audio_file, path)
+        return await transcript_cache.get(audio_hash, load)
+    finally:
+        if not claimed:
+            path.unlink(missing_ok=True)
+
+
+def proxied_audio_url(audio_url: str) -> str:
+    """Routes remote TTS URLs through /audio/stream when the proxy is enabled."""
+    if audio_url and config.AUDIO_PROXY_ENABLED and audio_url.startswith("http"):
+        return f"/audio/stream/{audio_proxy.sign(audio_url)}"
+    return audio_url
+
+
+@app.post("/tts/batch")
+async def tts_batch(request: TTSBatchRequest):
+    """
+    Synthesizes many texts concurrently (at most TTS_BATCH_CONCURRENCY at once)
+    and streams one NDJSON line per item in completion order, then a summary:
+
+      {"type": "item", "index", "text", "voiceId", "audio_url" | "error", "ms"}
+      {"type": "summary", "count", "ok", "failed", "wall_ms", "sum_ms"}
+
+    Proxied audio_urls are signed tokens that carry the upstream URL, so they
+    stay valid however large the batch is, on any worker and across restarts,
+    for as long as the upstream URL itself does.
+    """
+    if len(request.items) > config.TTS_BATCH_MAX_ITEMS:
+        return JSONResponse(status_code=413, content={"error": f"At most {config.TTS_BATCH_MAX_ITEMS} items per batch."})
+    limit = asyncio.Semaphore(min(request.concurrency or config.TTS_BATCH_CONCURRENCY, config.TTS_BATCH_CONCURRENCY))
+
+    async def synthesize(index: int, item) -> dict:
+        async with limit:
+            start = time.perf_counter()
+            result = {"type": "item", "index": index, "text": item.text, "voiceId": item.voiceId}
+            try:
+                with provider_call("tts"):
+                    audio_url = await asyncio.wait_for(
+                        tts_provider.aconvert_text_to_speech(item.text, item.voiceId), config.TTS_TIMEOUT_S
+                    )
+                if not audio_url:
+                    raise RuntimeError("No audio URL in the API response.")
+                result["audio_url"] = proxied_audio_url(audio_url)
+            except asyncio.TimeoutError:
+                result["error"] = "TTS timed out."
+            except Exception as e:
+                result["error"] = f"TTS generation failed: {e}"
+            result["ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return result
+
+    async def results():
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(synthesize(i, item)) for i, item in enumerate(request.items)]
+        ok = failed = 0
+        sum_ms = 0.0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                ok, failed = (ok + 1, failed) if "audio_url" in result else (ok, failed + 1)
+                sum_ms += result["ms"]
+                yield json.dumps(result) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        yield json.dumps({
+            "type": "summary",
+            "count": len(tasks),
+            "ok": ok,
+            "failed": failed,
+            "wall_ms": round((time.perf_counter() - start) * 1000, 1),
+            "sum_ms": round(sum_ms, 1),
+        }) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+SENTENCE_END = re.compile(r'(?<=[.?!])\s+')
+
+
+async def speak_sentence(sentence: str, trace, chunk_times: Optional[list] = None) -> bytes:
+    """
+    Streams one sentence from the TTS provider; stamps tts_first_byte when its
+    first chunk arrives. `chunk_times` collects (perf_counter(), size) per chunk.
+    """
+    chunks = []
+    async for chunk in tts_provider.astream_speech(sentence):
+        trace.mark("tts_first_byte")
+        chunks.append(chunk)
+        if chunk_times is not None:
+            chunk_times.append((time.perf_counter(), len(chunk)))
+    return b"".join(chunks)
+
+
+async def agent_chat_events(session_id: str, audio_file: UploadFile, fmt: str, trace):
+    """
+    Streaming /agent/chat: yields events as each stage produces them.
+
+      {"type": "transcript", "text"}         once STT is done
+      {"type": "llm_delta", "text"}          per LLM chunk
+      {"type": "audio", "index", "b64"}      per sentence, synthesized while the LLM keeps going
+      {"type": "done", "text", "timings"}    full reply and the turn's trace marks (ms)
+      {"type": "error", "message"}           on failure or timeout
+
+    Written as NDJSON lines, or as SSE (`event:` / `data:`) with fmt="sse".
+    """
+    def encode(event: dict) -> str:
+        data = json.dumps(event)
+        return f"event: {event['type']}\ndata: {data}\n\n" if fmt == "sse" else data + "\n"
+
+    events: asyncio.Queue = asyncio.Queue()
+    sentences: asyncio.Queue = asyncio.Queue()
+
+    async def run_llm(user_query_text: str):
+        session_history = await sessions.load(session_id)
+        reply, pending = "", ""
+        with provider_call("llm"):
+            async for delta in llm_provider.astream_llm_response(user_query_text, session_history):
+                trace.mark("llm_first_token")
+                reply += delta
+                await events.put({"type": "llm_delta", "text": delta})
+                *complete, pending = SENTENCE_END.split(pending + delta)
+                for sentence in complete:
+                    if sentence.strip():
+                        trace.mark("first_sentence")
+                        sentences.put_nowait(sentence.strip())
+        if pending.strip():
+            trace.mark("first_sentence")
+            sentences.put_nowait(pending.strip())
+        sentences.put_nowait(None)
+        await sessions.append(session_id, user_query_text, reply)
+        return reply
+
+    async def run_tts():
+        index = 0
+        while (sentence := await sentences.get()) is not None:
+            with provider_call("tts"):
+                audio_bytes = await asyncio.wait_for(speak_sentence(sentence, trace), config.TTS_TIMEOUT_S)
+            if audio_bytes:
+                await events.put({"type": "audio", "index": index, "b64": base64.b64encode(audio_bytes).decode("utf-8")})
+                index += 1
+
+    async def run_turn():
+        try:
+            with provider_call("stt"):
+                user_query_text = await asyncio.wait_for(transcribe_upload(audio_file), config.STT_TIMEOUT_S)
+            trace.mark("stt_final")
+            await events.put({"type": "transcript", "text": user_query_text})
+
+            tts_task = asyncio.ensure_future(run_tts())
+            try:
+                reply = await asyncio.wait_for(run_llm(user_query_text), config.LLM_TIMEOUT_S)
+                await tts_task
+            finally:
+                tts_task.cancel()
+            await events.put({"type": "done", "text": reply})
+        except asyncio.TimeoutError:
+            logging.error(f"[{session_id}] Stage timed out in streaming agent chat.")
+            trace.finish("timeout")
+            await events.put({"type": "error", "message": "A pipeline stage timed out."})
+        except Exception as e:
+            logging.error(f"[{session_id}] Error in streaming agent chat: {e}")
+            trace.finish("error")
+            await events.put({"type": "error", "message": str(e)})
+        finally:
+            await events.put(None)
+
+    turn_task = asyncio.ensure_future(run_turn())
+    try:
+        while (event := await events.get()) is not None:
+            if event["type"] == "audio":
+                trace.mark_audio_sent()
+            elif event["type"] == "done":
+                trace.finish()
+                event["timings"] = trace.offsets_ms()
+            yield encode(event)
+    finally:
+        # Client went away: stop the pipeline instead of finishing the turn for nobody
+        turn_task.cancel()
+        trace.finish("cancelled")
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text-format metrics for capacity planning."""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/debug/loop")
+async def event_loop_stats():
+    """Event loop lag percentiles and the stacks of recent blocking calls (LOOP_MONITOR_ENABLED)."""
+    if loop_monitor is None:
+        return JSONResponse(status_code=404, content={"error": "Loop monitor is disabled; set LOOP_MONITOR_ENABLED=true."})
+    return loop_monitor.stats()
+
+
+@app.get("/latency")
+async def latency_stats():
+    """Per-stage latency percentiles (ms) of finished turns, by path."""
+    return tracer.stats()
+
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """Backend, live sessions and eviction/batching counters of the /agent/chat session store."""
+    return sessions.stats()
+
+
+@app.get("/audio/stream/{audio_id}")
+async def stream_audio(audio_id: str):
+    """Pipes generated TTS audio to the client as it downloads (or from the write-through cache)."""
+    cached = audio_proxy.cached_path(audio_id)
+    if cached is not None:
+        return FileResponse(cached, media_type="audio/mpeg")
+
+    url = audio_proxy.get_url(audio_id)
+    if url is None:
+        return JSONResponse(status_code=404, content={"error": "Unknown audio id."})
+    try:
+        upstream = await providers.run_blocking(audio_proxy.open, url)
+    except Exception as e:
+        logging.error(f"Audio proxy could not fetch {audio_id}: {e}")
+        return JSONResponse(status_code=502, content={"error": f"Failed to fetch audio: {e}"})
+
+    headers = {}
+    if "content-length" in upstream.headers:
+        headers["Content-Length"] = upstream.headers["content-length"]
+    return StreamingResponse(
+        audio_proxy.iter_chunks(audio_id, upstream),
+        media_type=upstream.headers.get("content-type", "audio/mpeg"),
+        headers=headers,
+    )
+
+
+@app.get("/audio/files/{name}")
+async def get_audio_file(name: str):
+    """Serves a stored audio file; FileResponse handles Range requests and uses sendfile where the server supports it."""
+    path = audio_store.path(name) if audio_store.is_valid_name(name) else None
+    if path is None:
+        return JSONResponse(status_code=404, content={"error": "Audio file not found."})
+    media_type = "audio/mpeg" if name.endswith(".mp3") else "audio/wav" if name.endswith(".wav") else "application/octet-stream"
+    # Names are content hashes, so the bytes behind a name never change
+    return FileResponse(path, media_type=media_type, headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+
+@app.get("/audio/store/stats")
+async def audio_store_stats():
+    return audio_store.stats()
+
+
+async def load_voices():
+    """Fetches the voice catalog once and pre-encodes the response body and its ETag."""
+    with provider_call("tts"):
+        voices = await providers.run_blocking(tts_provider.get_available_voices)
+    body = json.dumps({"voices": voices}).encode()
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+@app.get("/voices")
+async def get_voices(request: Request):
+    """Returns the available voices, cached, with ETag / If-None-Match support."""
+    try:
+        body, etag = await voices_cache.get("voices", load_voices)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": f"Failed to fetch voices: {e}"})
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={int(config.VOICES_CACHE_TTL_S)}, "
+                         f"stale-while-revalidate={int(config.VOICES_STALE_S)}",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.post("/transcribe/jobs", status_code=202)
+async def submit_transcription_job(audio_file: UploadFile = File(...)):
+    """Accepts an audio file and returns a job id at once; transcription runs in the background."""
+    suffix = PathLib(audio_file.filename or "").suffix
+    job_path = JOB_UPLOADS_DIR / f"{uuid4().hex}{suffix}"
+    audio_hash = await providers.run_blocking(save_upload, audio_file, job_path)
+
+    cached_text = transcript_cache.peek(audio_hash)
+    if cached_text is not None:
+        os.remove(job_path)
+        return JSONResponse(status_code=202, content=transcription_jobs.complete_cached(cached_text).to_dict())
+
+    try:
+        job = transcription_jobs.submit(str(job_path))
+    except JobQueueFull as e:
+        os.remove(job_path)
+        return JSONResponse(status_code=429, content={"error": str(e)})
+    task = asyncio.create_task(cache_job_transcript(job, audio_hash))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+async def cache_job_transcript(job, audio_hash: str):
+    await job.done.wait()
+    if job.status == "completed":
+        transcript_cache.put(audio_hash, job.text)
+
+
+@app.get("/transcribe/jobs/stats")
+async def transcription_job_stats():
+    """Queue depth, concurrency and throughput of the batch transcription workers."""
+    return JSONResponse(content=transcription_jobs.stats())
+
+
+@app.get("/transcribe/jobs/{job_id}")
+async def get_transcription_job(job_id: str):
+    """
+    Returns the status, and once finished the transcript, of a batch job.
+    Jobs are per process: with several workers, an id from another worker is a 404.
+    """
+    job = transcription_jobs.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"error": "Unknown job id"})
+    return JSONResponse(content=job.to_dict())
+
+
+@app.websocket("/ws/jobs/{job_id}")
+async def transcription_job_updates(websocket: WebSocket, job_id: str):
+    """Pushes a batch job's result to the client as soon as it finishes."""
+    await websocket.accept()
+    job = transcription_jobs.get(job_id)
+    if not job:
+        await websocket.send_json({"type": "error", "message": "Unknown job id"})
+        await websocket.close()
+        return
+    await websocket.send_json({"type": "job", **job.to_dict()})
+    if not job.done.is_set():
+        await job.done.wait()
+        await websocket.send_json({"type": "job", **job.to_dict()})
+    await websocket.close()
 
 
 @app.websocket("/ws")
@@ -44,55 +617,248 @@ async def websocket_endpoint(websocket: WebSocket):
     """Handles WebSocket connection for real-time transcription and voice response."""
     await websocket.accept()
     logging.info("WebSocket client connected.")
+    metrics.ACTIVE_WEBSOCKETS.inc()
+    ws_bytes = {"in": 0, "out": 0}
+    recorder = SessionRecorder.for_session(config.SESSION_RECORD_DIR) if config.SESSION_RECORD_DIR else None
 
     loop = asyncio.get_event_loop()
     chat_history = []
 
-    async def handle_transcript(text: str):
+    async def handle_transcript(text: str, trace):
         """Processes the final transcript, gets LLM and TTS responses, and streams audio."""
+        trace.mark("stt_final")
         await websocket.send_json({"type": "final", "text": text})
         try:
-            # 1. Get the full text response from the LLM (non-streaming)
-            full_response, updated_history = llm.get_llm_response(text, chat_history)
+            # 1. Get the full text response from the LLM (non-streaming, off the event loop)
+            llm_started = time.perf_counter()
+            with provider_call("llm"):
+                full_response, updated_history = await llm_provider.aget_llm_response(text, chat_history)
+            trace.mark("llm_first_token")
+            if recorder:
+                recorder.llm_call(llm_started, text, full_response)
             
-            # Update history for the next turn
-            chat_history.clear()
-            chat_history.extend(updated_history)
+            # Update history for the next turn, as plain dicts rather than the SDK's Content
+            # objects; providers return the history unchanged when the LLM call failed
+            if len(updated_history) > len(chat_history):
+                chat_history[:] = append_turn(chat_history, text, full_response)
 
             # Send the full text response to the UI
             await websocket.send_json({"type": "assistant", "text": full_response})
 
             # 2. Split the response into sentences
             sentences = re.split(r'(?<=[.?!])\s+', full_response.strip())
+            trace.mark("first_sentence")
             
             # 3. Process each sentence for TTS and stream audio back
             for sentence in sentences:
                 if sentence.strip():
-                    # Run the blocking TTS function in a separate thread
-                    audio_bytes = await loop.run_in_executor(
-                        None, tts.speak, sentence.strip()
-                    )
+                    # Stream the sentence off the event loop; tts_first_byte is its first chunk
+                    tts_started, chunk_times = time.perf_counter(), []
+                    with provider_call("tts"):
+                        audio_bytes = await speak_sentence(sentence.strip(), trace, chunk_times)
+                    if recorder:
+                        recorder.tts_call(tts_started, sentence.strip(), len(audio_bytes or b""), chunk_times)
                     if audio_bytes:
                         b64_audio = base64.b64encode(audio_bytes).decode('utf-8')
                         await websocket.send_json({"type": "audio", "b64": b64_audio})
+                        ws_bytes["out"] += len(b64_audio)
+                        metrics.WS_BYTES.inc(len(b64_audio), "out")
+                        trace.mark_audio_sent()
+            trace.finish()
 
+        except asyncio.CancelledError:
+            trace.finish("cancelled")
+            raise
         except Exception as e:
             logging.error(f"Error in LLM/TTS pipeline: {e}")
+            trace.finish("error")
             await websocket.send_json({"type": "llm", "text": "Sorry, I encountered an error."})
+        finally:
+            if recorder:
+                recorder.turn(trace)
+
+
+    # Optional local endpointing: fire the turn on the latest partial before
+    # AssemblyAI's end_of_turn, then reconcile when the provider final arrives
+    endpointer = None
+    if config.LOCAL_ENDPOINTING_ENABLED:
+        endpointer = LocalEndpointer(
+            is_speech=VoiceActivityDetector(energy_threshold_db=config.VAD_ENERGY_THRESHOLD_DB).is_speech,
+            silence_ms=config.ENDPOINT_SILENCE_MS,
+            stable_ms=config.ENDPOINT_STABLE_MS,
+        )
+    turn = {"task": None, "history_len": 0, "trace": None}
+
+    def start_turn(text: str):
+        # The trace was opened at the turn's speech onset; a re-run turn gets a fresh one
+        trace, turn["trace"] = turn["trace"] or tracer.start("ws"), None
+        turn["history_len"] = len(chat_history)
+        turn["task"] = asyncio.ensure_future(handle_transcript(text, trace))
+
+    def fire_early(early_text):
+        if early_text:
+            logging.info(f"Local endpoint fired: {early_text}")
+            start_turn(early_text)
+
+    def handle_partial(text: str):
+        fire_early(endpointer.on_partial(text, time.monotonic()))
+
+    def handle_final(text: str):
+        outcome = endpointer.on_final(text, time.monotonic())
+        if outcome == "confirmed":
+            return
+        if outcome == "corrected":
+            # False endpoint: drop the early turn and answer the full utterance instead
+            logging.info("Local endpoint was premature; re-running turn with the provider final.")
+            if turn["task"] and not turn["task"].done():
+                turn["task"].cancel()
+            del chat_history[turn["history_len"]:]
+        start_turn(text)
 
+    def on_partial_transcript(text: str):
+        if recorder:
+            recorder.stt_partial(text)
+        loop.call_soon_threadsafe(handle_partial, text)
 
     def on_final_transcript(text: str):
         logging.info(f"Final transcript received: {text}")
-        asyncio.run_coroutine_threadsafe(handle_transcript(text), loop)
+        if recorder:
+            recorder.stt_final(text)
+        loop.call_soon_threadsafe(handle_final if endpointer else start_turn, text)
 
-    transcriber = stt.AssemblyAIStreamingTranscriber(on_final_callback=on_final_transcript)
+    transcriber = stt_provider.create_streaming_transcriber(
+        on_partial_callback=on_partial_transcript if endpointer else None,
+        on_final_callback=on_final_transcript,
+    )
+    metrics.OPEN_PROVIDER_CALLS.inc(1, "stt_stream")
+
+    # Re-frame client blocks (20 ms worklet frames or 4096-sample ScriptProcessor
+    # blocks) into provider-sized frames
+    reframer = PCMReframer(frame_ms=config.STT_FRAME_MS) if config.STT_FRAME_MS else None
+
+    # Optional VAD gate: only speech (plus keep-alives) is streamed to AssemblyAI
+    vad = None
+    if config.VAD_ENABLED:
+        vad = VoiceActivityDetector(
+            energy_threshold_db=config.VAD_ENERGY_THRESHOLD_DB,
+            hangover_ms=config.VAD_HANGOVER_MS,
+            preroll_ms=config.VAD_PREROLL_MS,
+            keepalive_ms=config.VAD_KEEPALIVE_MS,
+        )
+
+    async def end_session(message: str):
+        try:
+            await websocket.send_json({"type": "error", "message": message})
+            await websocket.close(code=1011)
+        except Exception as e:
+            logging.info(f"WebSocket already closed: {e}")
+
+    def on_send_error(error: Exception):
+        # The STT stream is gone; end the session instead of letting frames pile up unseen
+        task = asyncio.ensure_future(end_session("Speech recognition failed. Please reconnect."))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+    # Speech/silence per frame: marks a turn's speech onset and picks what the send queue drops first
+    is_speech = (vad or VoiceActivityDetector(energy_threshold_db=config.VAD_ENERGY_THRESHOLD_DB)).is_speech
+
+    # Bounded send path: the receive loop only enqueues, a sender task talks to AssemblyAI
+    send_queue = stt.STTSendQueue(
+        transcriber.stream_audio,
+        max_frames=config.STT_SEND_QUEUE_FRAMES,
+        is_speech=is_speech,
+        on_error=on_send_error,
+    )
+    sender_task = asyncio.create_task(send_queue.run())
+    live_send_queues.add(send_queue)
+
+    def forward_audio(frame: bytes):
+        for chunk in (vad.process(frame) if vad else [frame]):
+            send_queue.put(chunk)
+
+    # Uplink codec and sample rate, declared by the client's {"type": "config"} message.
+    # Audio at any other rate is resampled to the 16 kHz AssemblyAI is configured for.
+    uplink_codec = "pcm16"
+    resampler = None
+
+    async def handle_control(text: str):
+        nonlocal uplink_codec, resampler
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return
+        if message.get("type") == "config":
+            requested = message.get("codec", "pcm16")
+            try:
+                sample_rate = int(message.get("sample_rate", 16000))
+            except (TypeError, ValueError):
+                sample_rate = None
+            if requested not in codec.SUPPORTED_CODECS or sample_rate is None or not 8000 <= sample_rate <= 192000:
+                # Keep decoding as before and tell the client what is still in force
+                await websocket.send_json({
+                    "type": "error",
+                    "message": f"Unsupported uplink config: codec={requested!r}, sample_rate={message.get('sample_rate')!r}",
+                })
+                await websocket.send_json({
+                    "type": "config",
+                    "codec": uplink_codec,
+                    "sample_rate": resampler.src_rate if resampler else 16000,
+                })
+                return
+
+            uplink_codec = requested
+            if sample_rate == 16000:
+                resampler = None
+            elif resampler is None or resampler.src_rate != sample_rate:
+                resampler = StreamingResampler(sample_rate, 16000)
+
+            await websocket.send_json({"type": "config", "codec": uplink_codec, "sample_rate": sample_rate})
 
     try:
         while True:
-            data = await websocket.receive_bytes()
-            transcriber.stream_audio(data)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") is not None:
+                if recorder:
+                    recorder.text_in(message["text"])
+                await handle_control(message["text"])
+                continue
+            if recorder:
+                recorder.audio_in(message["bytes"])
+            ws_bytes["in"] += len(message["bytes"])
+            metrics.WS_BYTES.inc(len(message["bytes"]), "in")
+            data = codec.decode_uplink(uplink_codec, message["bytes"])
+            if resampler is not None:
+                data = resampler.process(data)
+            for frame in (reframer.feed(data) if reframer is not None else [data]):
+                # Open the turn's trace at speech onset, so idle time before it is not counted as STT
+                if turn["trace"] is None and is_speech(frame):
+                    turn["trace"] = tracer.start("ws")
+                if endpointer:
+                    fire_early(endpointer.on_audio(frame, time.monotonic()))
+                forward_audio(frame)
     except Exception as e:
         logging.info(f"WebSocket connection closed: {e}")
     finally:
+        if reframer is not None and len(reframer):
+            forward_audio(reframer.flush())
+        send_queue.close()
+        try:
+            await asyncio.wait_for(sender_task, timeout=2.0)
+        except Exception as e:
+            logging.warning(f"STT sender did not drain cleanly: {e!r}")
+            sender_task.cancel()
         transcriber.close()
+        live_send_queues.discard(send_queue)
+        metrics.OPEN_PROVIDER_CALLS.dec(1, "stt_stream")
+        metrics.ACTIVE_WEBSOCKETS.dec()
+        metrics.observe_session_bytes(ws_bytes["in"], ws_bytes["out"])
+        if recorder:
+            recorder.close()
+        logging.info(f"STT send queue: {send_queue.stats()}")
+        if endpointer:
+            logging.info(f"Local endpointing: {endpointer.stats()}")
+        if vad:
+            logging.info(f"VAD suppressed {vad.suppressed_ratio:.1%} of uplink audio: {vad.stats()}")
         logging.info("Transcription resources released.")
\ No newline at end of file
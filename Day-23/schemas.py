@@ -1,7 +1,14 @@
 # schemas.py
 
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
 
 class TTSRequest(BaseModel):
     text: str
-    voiceId: str = "en-US-natalie"
\ No newline at end of file
+    voiceId: str = "en-US-natalie"
+
+
+class TTSBatchRequest(BaseModel):
+    items: List[TTSRequest] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)
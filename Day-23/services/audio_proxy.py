@@ -0,0 +1,137 @@
+# services/audio_proxy.py
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from uuid import uuid4
+
+import requests
+
+from services.audio_store import AudioStore
+
+logger = logging.getLogger(__name__)
+
+_SIGNATURE_CHARS = 22  # 128 bits of the HMAC-SHA256, base64url
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def load_or_create_key(path: Path) -> bytes:
+    """
+    Returns the proxy signing key stored at `path`, creating it on first use.
+    Every worker on the host reads the same file, and the key survives
+    restarts, so links keep working across both.
+    """
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{uuid4().hex}.key")
+    with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as f:
+        f.write(secrets.token_bytes(32))
+    try:
+        os.link(tmp_path, path)  # atomic; fails if another worker got there first
+    except FileExistsError:
+        pass
+    finally:
+        tmp_path.unlink()
+    return path.read_bytes()
+
+
+class AudioProxy:
+    """
+    Streams remote TTS audio (e.g. Murf's `audioFile` URLs) to the client
+    through our own origin, chunk by chunk as it downloads, instead of
+    downloading the whole file first and handing the client a second URL.
+
+    `sign(url)` turns a URL into an audio id that carries the URL itself,
+    HMAC-signed with `key`, so the proxy only ever fetches URLs the server
+    produced. No registry is kept: any worker holding the same key resolves
+    any id, and ids stay valid across restarts (for as long as the upstream
+    URL does). With a `store`, each stream is written through to the audio
+    store and later requests for the same id in this process are served
+    from the stored file; up to `max_cached` ids are remembered for that.
+    """
+
+    def __init__(self, key: bytes, store: Optional[AudioStore] = None, chunk_size: int = 64 * 1024,
+                 max_cached: int = 10000, timeout_s: float = 30.0):
+        self.key = key
+        self.store = store
+        self.chunk_size = chunk_size
+        self.max_cached = max_cached
+        self.timeout_s = timeout_s
+        self._stored: Dict[str, str] = {}  # audio id -> store file name
+        self._session = requests.Session()
+
+    def _signature(self, payload: str) -> str:
+        return _b64(hmac.new(self.key, payload.encode("ascii"), hashlib.sha256).digest())[:_SIGNATURE_CHARS]
+
+    def sign(self, url: str) -> str:
+        """Returns the audio id to proxy a remote audio URL under: `<url, base64url>.<signature>`."""
+        payload = _b64(url.encode("utf-8"))
+        return f"{payload}.{self._signature(payload)}"
+
+    def get_url(self, audio_id: str) -> Optional[str]:
+        """Returns the URL an id was signed for, or None if the id is malformed or not ours."""
+        payload, _, signature = audio_id.partition(".")
+        if not payload or not hmac.compare_digest(signature, self._signature(payload)):
+            return None
+        try:
+            return _unb64(payload).decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+
+    def cached_path(self, audio_id: str) -> Optional[Path]:
+        name = self._stored.get(audio_id)
+        if self.store is None or name is None:
+            return None
+        return self.store.path(name)
+
+    def open(self, url: str) -> requests.Response:
+        """Starts the upstream download (blocking; run it off the event loop) and checks its status."""
+        response = self._session.get(url, stream=True, timeout=self.timeout_s)
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return response
+
+    def iter_chunks(self, audio_id: str, response: requests.Response) -> Iterator[bytes]:
+        """
+        Yields the upstream body as it arrives, writing it through to the store.
+        The file is only committed once the download completed, so a client
+        disconnect or upstream error never leaves a truncated file behind.
+        """
+        writer = self.store.writer(".mp3") if self.store is not None else None
+        completed = False
+        try:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if writer is not None:
+                    writer.write(chunk)
+                yield chunk
+            completed = True
+        except Exception as e:
+            logger.error(f"Audio proxy stream {audio_id} failed: {e}")
+            raise
+        finally:
+            response.close()
+            if writer is not None:
+                if completed:
+                    self._stored[audio_id] = writer.commit()
+                    while len(self._stored) > self.max_cached:
+                        del self._stored[next(iter(self._stored))]
+                else:
+                    writer.abort()
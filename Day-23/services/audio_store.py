@@ -0,0 +1,180 @@
+# services/audio_store.py
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Stored files are named by content: <32 hex chars of SHA-256><suffix>
+_NAME_RE = re.compile(r"^[0-9a-f]{32}\.(mp3|wav|pcm)$")
+
+
+class AudioStoreWriter:
+    """Streams one file into the store, hashing it as it goes. Use `commit()` or `abort()`."""
+
+    def __init__(self, store: "AudioStore", suffix: str):
+        self.store = store
+        self.suffix = suffix
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._tmp_path = store.root / f".{uuid4().hex}.part"
+        self._file = open(self._tmp_path, "wb")
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> str:
+        """Moves the file to its content-hash name and returns that name."""
+        self._file.close()
+        name = f"{self._hash.hexdigest()[:32]}{self.suffix}"
+        self.store._adopt(self._tmp_path, name, self.size)
+        return name
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+class AudioStore:
+    """
+    Bounded on-disk store for generated and uploaded audio.
+
+    Files are content-addressed, so identical audio is stored once and a
+    name never changes meaning (safe to cache as immutable). The in-memory
+    index is kept in LRU order: `path()` counts as an access. Writing past
+    `max_bytes` evicts the least recently used files at once, and a
+    background thread also drops files not accessed for `max_age_s`.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, max_age_s: float, sweep_interval_s: float = 60.0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.sweep_interval_s = sweep_interval_s
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, list]" = OrderedDict()  # name -> [size, last_access]
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+
+        self._load_index()
+        threading.Thread(target=self._sweep_loop, name="audio-store-sweeper", daemon=True).start()
+
+    def _load_index(self):
+        """Rebuilds the index from disk (oldest access first) and clears half-written files."""
+        entries = []
+        for path in self.root.iterdir():
+            if path.name.endswith(".part"):
+                path.unlink(missing_ok=True)
+            elif _NAME_RE.match(path.name):
+                st = path.stat()
+                entries.append((max(st.st_atime, st.st_mtime), path.name, st.st_size))
+        for accessed, name, size in sorted(entries):
+            self._index[name] = [size, accessed]
+            self.total_bytes += size
+        self._evict_over_quota()
+
+    @staticmethod
+    def is_valid_name(name: str) -> bool:
+        return bool(_NAME_RE.match(name))
+
+    def writer(self, suffix: str = ".mp3") -> AudioStoreWriter:
+        return AudioStoreWriter(self, suffix)
+
+    def put_bytes(self, data: bytes, suffix: str = ".mp3") -> str:
+        writer = self.writer(suffix)
+        try:
+            writer.write(data)
+        except Exception:
+            writer.abort()
+            raise
+        return writer.commit()
+
+    def path(self, name: str) -> Optional[Path]:
+        """Returns the file's path and marks it recently used, or None if it is not stored."""
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry[1] = time.time()
+            self._index.move_to_end(name)
+            self.hits += 1
+        return self.root / name
+
+    def _adopt(self, tmp_path: Path, name: str, size: int):
+        with self._lock:
+            if name in self._index:
+                # Same content already stored: keep the existing file, just refresh it
+                os.remove(tmp_path)
+                self._index[name][1] = time.time()
+                self._index.move_to_end(name)
+                return
+            os.replace(tmp_path, self.root / name)
+            self._index[name] = [size, time.time()]
+            self.total_bytes += size
+            self._evict_over_quota()
+
+    def _remove(self, name: str):
+        # Caller holds the lock
+        size, _ = self._index.pop(name)
+        self.total_bytes -= size
+        self.evicted_files += 1
+        self.evicted_bytes += size
+        try:
+            os.remove(self.root / name)
+        except OSError as e:
+            logger.warning(f"Audio store could not remove {name}: {e}")
+
+    def _evict_over_quota(self):
+        # Caller holds the lock
+        while self.total_bytes > self.max_bytes and self._index:
+            self._remove(next(iter(self._index)))
+
+    def sweep(self):
+        """Drops files not accessed within max_age_s, then enforces the size quota."""
+        cutoff = time.time() - self.max_age_s
+        with self._lock:
+            # LRU order means expired entries are all at the front
+            while self._index:
+                name, (size, accessed) = next(iter(self._index.items()))
+                if accessed >= cutoff:
+                    break
+                self._remove(name)
+            self._evict_over_quota()
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval_s)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Audio store sweep failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._index),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted_files": self.evicted_files,
+                "evicted_bytes": self.evicted_bytes,
+            }
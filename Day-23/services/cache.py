@@ -0,0 +1,108 @@
+# services/cache.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTTLCache:
+    """
+    Keyed async cache with a TTL, stale-while-revalidate and single-flight loads.
+
+    `get(key, loader)` returns a fresh value straight from memory. Within
+    `stale_s` after expiry the stale value is returned at once and one
+    background `loader()` call refreshes it. On a cold miss, concurrent
+    callers share a single in-flight load. `loader()` is called only when a
+    load actually starts, and the awaitable it returns always runs to the
+    end, even if every caller gives up. At most `max_entries` keys are
+    kept, least recently used first out.
+    """
+
+    def __init__(self, ttl_s: float, stale_s: float = 0.0, max_entries: int = 1024):
+        self.ttl_s = ttl_s
+        self.stale_s = stale_s
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.errors = 0
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            fetched_at, value = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl_s:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.ttl_s + self.stale_s:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._load(key, loader)
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        # Shield the shared load so one cancelled caller does not cancel it for the others
+        return await asyncio.shield(self._load(key, loader))
+
+    def peek(self, key: Hashable) -> Any:
+        """Returns the cached value for `key` (fresh or stale) without loading, or None."""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl_s + self.stale_s:
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_loader(key, loader()))
+            task.add_done_callback(self._log_background_error)
+            self._inflight[key] = task
+        return task
+
+    async def _run_loader(self, key: Hashable, pending: Awaitable[Any]) -> Any:
+        self.loads += 1
+        try:
+            value = await pending
+            self.put(key, value)
+            return value
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _log_background_error(task: asyncio.Task):
+        # Retrieves the exception so stale-while-revalidate failures are logged, not lost
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Cache refresh failed: {task.exception()}")
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "errors": self.errors,
+        }
@@ -0,0 +1,51 @@
+# services/codec.py
+"""
+Uplink audio codecs. Clients negotiate one per websocket session with a
+`{"type": "config", "codec": ...}` message; everything is decoded to 16-bit
+PCM before it reaches the STT stage.
+
+  pcm16: raw 16-bit little-endian PCM (256 kbps at 16 kHz), the default
+  mulaw: 8-bit G.711 mu-law (128 kbps at 16 kHz)
+"""
+import numpy as np
+
+SUPPORTED_CODECS = ("pcm16", "mulaw")
+
+_MULAW_BIAS = 0x84
+_MULAW_CLIP = 32635
+
+
+def _build_mulaw_table() -> np.ndarray:
+    """All 256 mu-law code words decoded to int16, computed once (G.711)."""
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    sign = u & 0x80
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    magnitude = (((mantissa << 3) + _MULAW_BIAS) << exponent) - _MULAW_BIAS
+    return np.where(sign, -magnitude, magnitude).astype("<i2")
+
+
+MULAW_DECODE_TABLE = _build_mulaw_table()
+
+
+def decode_mulaw(data: bytes) -> bytes:
+    """Decodes mu-law bytes to 16-bit PCM with a single table lookup."""
+    return MULAW_DECODE_TABLE[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
+def encode_mulaw(pcm: bytes) -> bytes:
+    """Encodes 16-bit PCM to mu-law (used by tools and benchmarks; browsers encode client-side)."""
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.int32)
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(samples), _MULAW_CLIP) + _MULAW_BIAS
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    exponent = np.clip(exponent, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def decode_uplink(codec: str, data: bytes) -> bytes:
+    """Decodes one uplink websocket message in the session's codec to 16-bit PCM."""
+    if codec == "mulaw":
+        return decode_mulaw(data)
+    return data
@@ -0,0 +1,110 @@
+# services/endpointing.py
+import re
+from typing import Callable, List, Optional
+
+
+def _normalize(text: str) -> str:
+    """Lowercase words only, so formatted and unformatted transcripts compare equal."""
+    return " ".join(re.findall(r"[\w']+", text.lower()))
+
+
+class LocalEndpointer:
+    """
+    Local end-of-turn detector that fires before the provider's end_of_turn.
+
+    A turn is fired with the latest partial transcript once both signals agree:
+      - the server has seen `silence_ms` of trailing silence in the uplink audio
+      - the partial transcript has not changed for `stable_ms`
+
+    When the provider's final transcript arrives, `on_final()` reconciles it:
+      - "confirmed": the final matches what was fired, nothing more to do
+      - "corrected": the user kept talking (a false endpoint); the caller
+        should discard the early turn and run the final instead
+      - "unfired":   the provider got there first; run the final as usual
+    """
+
+    def __init__(
+        self,
+        is_speech: Callable[[bytes], bool],
+        silence_ms: int = 600,
+        stable_ms: int = 300,
+        sample_rate: int = 16000,
+    ):
+        self.is_speech = is_speech
+        self.silence_ms = silence_ms
+        self.stable_ms = stable_ms
+        self.sample_rate = sample_rate
+
+        self._partial = ""
+        self._partial_changed_at = 0.0
+        self._trailing_silence_ms = 0.0
+        self._fired_text: Optional[str] = None
+        self._fired_at = 0.0
+
+        # Stats
+        self.confirmed = 0
+        self.corrected = 0
+        self.unfired = 0
+        self.saved_ms: List[float] = []
+
+    @property
+    def fired(self) -> bool:
+        return self._fired_text is not None
+
+    def on_audio(self, frame: bytes, now: float) -> Optional[str]:
+        """Feeds one uplink frame; returns the text to fire the turn with, if confident."""
+        if self.is_speech(frame):
+            self._trailing_silence_ms = 0.0
+        else:
+            self._trailing_silence_ms += len(frame) / 2 / self.sample_rate * 1000
+        return self._check(now)
+
+    def on_partial(self, text: str, now: float) -> Optional[str]:
+        """Feeds one partial transcript; returns the text to fire with, if confident."""
+        if _normalize(text) != _normalize(self._partial):
+            self._partial_changed_at = now
+        self._partial = text
+        return self._check(now)
+
+    def _check(self, now: float) -> Optional[str]:
+        if self.fired or not self._partial.strip():
+            return None
+        if self._trailing_silence_ms < self.silence_ms:
+            return None
+        if (now - self._partial_changed_at) * 1000 < self.stable_ms:
+            return None
+        self._fired_text = self._partial
+        self._fired_at = now
+        return self._fired_text
+
+    def on_final(self, text: str, now: float) -> str:
+        """Reconciles the provider's final transcript and resets for the next turn."""
+        if not self.fired:
+            outcome = "unfired"
+            self.unfired += 1
+        elif _normalize(text) == _normalize(self._fired_text):
+            outcome = "confirmed"
+            self.confirmed += 1
+            self.saved_ms.append((now - self._fired_at) * 1000)
+        else:
+            outcome = "corrected"
+            self.corrected += 1
+
+        self._partial = ""
+        self._fired_text = None
+        return outcome
+
+    @property
+    def false_endpoint_rate(self) -> float:
+        fired = self.confirmed + self.corrected
+        return self.corrected / fired if fired else 0.0
+
+    def stats(self) -> dict:
+        saved = sorted(self.saved_ms)
+        return {
+            "confirmed": self.confirmed,
+            "corrected": self.corrected,
+            "unfired": self.unfired,
+            "false_endpoint_rate": round(self.false_endpoint_rate, 4),
+            "mean_saved_ms": round(sum(saved) / len(saved), 1) if saved else 0.0,
+        }
@@ -0,0 +1,57 @@
+# services/executors.py
+"""
+Thread pools that report their own saturation.
+
+ThreadPoolExecutor has no public view of its backlog, so CountingExecutor
+keeps count itself: a call is queued from submit() until a thread picks it
+up, running until it returns, and a done-callback settles the count even
+for calls cancelled before they started.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self, max_workers: Optional[int] = None, thread_name_prefix: str = ""):
+        # Same default size as ThreadPoolExecutor and asyncio's default executor
+        self.max_threads = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        super().__init__(max_workers=self.max_threads, thread_name_prefix=thread_name_prefix)
+        self._count_lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        started = False
+
+        def run():
+            nonlocal started
+            with self._count_lock:
+                started = True
+                self.queued -= 1
+                self.running += 1
+            return fn(*args, **kwargs)
+
+        def settle(_future: Future):
+            with self._count_lock:
+                if started:
+                    self.running -= 1
+                else:
+                    self.queued -= 1
+
+        with self._count_lock:
+            self.queued += 1
+        try:
+            future = super().submit(run)
+        except Exception:
+            with self._count_lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(settle)
+        return future
+
+    def stats(self) -> Dict[str, int]:
+        """Queued calls, running calls and max threads."""
+        with self._count_lock:
+            return {"queued": self.queued, "running": self.running, "max_threads": self.max_threads}
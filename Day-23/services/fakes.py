@@ -0,0 +1,310 @@
+# services/fakes.py
+"""
+Deterministic local stand-ins for AssemblyAI, Gemini and Murf.
+
+Every fake takes the same tuning knobs:
+  - latency_s:        processing time before a result (STT turn/final, batch jobs)
+  - first_byte_s:     delay before the first streamed LLM/TTS chunk
+  - chunk_interval_s: delay between streamed chunks
+  - error_rate:       probability that a call fails
+  - seed:             makes errors and scripted content reproducible
+  - blocking:         async calls take the base-class path (blocking call on the
+                      provider thread pool) instead of asyncio.sleep, so load
+                      tests see the PROVIDER_THREADS ceiling the real SDKs hit
+"""
+import asyncio
+import io
+import itertools
+import logging
+import random
+import threading
+import time
+import wave
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from services.llm import append_turn
+from services.providers import LLMProvider, StreamingTranscriber, STTProvider, TTSProvider
+from services.vad import VoiceActivityDetector
+
+logger = logging.getLogger(__name__)
+
+SCRIPTED_UTTERANCES = [
+    "what is the weather like today",
+    "tell me a short joke",
+    "how do I reverse a list in python",
+    "set a timer for ten minutes",
+]
+
+
+class FakeProviderError(Exception):
+    """An injected failure from a fake provider."""
+
+
+class _Fake:
+    def __init__(
+        self,
+        latency_s: float = 0.3,
+        first_byte_s: float = 0.2,
+        chunk_interval_s: float = 0.02,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        blocking: bool = False,
+    ):
+        self.latency_s = latency_s
+        self.first_byte_s = first_byte_s
+        self.chunk_interval_s = chunk_interval_s
+        self.error_rate = error_rate
+        self.blocking = blocking
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _should_fail(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _maybe_fail(self, what: str):
+        if self._should_fail():
+            raise FakeProviderError(f"Injected {what} failure")
+
+
+class FakeStreamingTranscriber(StreamingTranscriber):
+    """
+    Streaming STT stand-in. Speech bursts in the PCM (energy/ZCR detector)
+    count as words: after each word a partial with that many words of the
+    scripted utterance is emitted, and after `end_of_turn_ms` of silence the
+    final. Callbacks fire `latency_s` later on a timer thread, like the SDK's
+    reader thread.
+    """
+
+    def __init__(self, fake: "FakeSTTProvider", sample_rate: int, on_partial_callback, on_final_callback,
+                 end_of_turn_ms: int = 700):
+        self.fake = fake
+        self.sample_rate = sample_rate
+        self.on_partial_callback = on_partial_callback
+        self.on_final_callback = on_final_callback
+        self.end_of_turn_ms = end_of_turn_ms
+        self.detector = VoiceActivityDetector(sample_rate=sample_rate)
+
+        self._script = fake.next_utterance().split()
+        self._words = 0
+        self._in_word = False
+        self._silence_ms = 0.0
+        self._closed = False
+
+    def _text(self) -> str:
+        return " ".join(self._script[: min(self._words, len(self._script))])
+
+    def _emit(self, callback, text: str):
+        if not callback:
+            return
+
+        def fire():
+            if not self._closed:
+                callback(text)
+
+        timer = threading.Timer(self.fake.latency_s, fire)
+        timer.daemon = True
+        timer.start()
+
+    def stream_audio(self, audio_chunk: bytes):
+        if self._closed:
+            return
+        if self.detector.is_speech(audio_chunk):
+            self._in_word = True
+            self._silence_ms = 0.0
+            return
+
+        if self._in_word:
+            self._in_word = False
+            self._words += 1
+            self._emit(self.on_partial_callback, self._text())
+
+        self._silence_ms += len(audio_chunk) / 2 / self.sample_rate * 1000
+        if self._words and self._silence_ms >= self.end_of_turn_ms:
+            text = " ".join(self._script) if self._words >= len(self._script) else self._text()
+            if self.fake._should_fail():
+                logger.warning("Fake STT dropped a turn (injected error)")
+            else:
+                self._emit(self.on_final_callback, text)
+            self._script = self.fake.next_utterance().split()
+            self._words = 0
+
+    def close(self):
+        self._closed = True
+
+
+class FakeSTTProvider(_Fake, STTProvider):
+    name = "fake"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._utterances = itertools.cycle(SCRIPTED_UTTERANCES)
+        self._jobs: Dict[str, float] = {}
+        self._job_ids = itertools.count(1)
+
+    def next_utterance(self) -> str:
+        with self._lock:
+            return next(self._utterances)
+
+    def create_streaming_transcriber(self, sample_rate=16000, on_partial_callback=None, on_final_callback=None):
+        return FakeStreamingTranscriber(self, sample_rate, on_partial_callback, on_final_callback)
+
+    def transcribe_audio(self, audio_file) -> str:
+        time.sleep(self.latency_s)
+        self._maybe_fail("transcription")
+        return self.next_utterance()
+
+    async def atranscribe_audio(self, audio_file) -> str:
+        if self.blocking:
+            return await super().atranscribe_audio(audio_file)
+        await asyncio.sleep(self.latency_s)
+        self._maybe_fail("transcription")
+        return self.next_utterance()
+
+    def submit_transcription(self, audio_path: str) -> str:
+        self._maybe_fail("transcription submit")
+        with self._lock:
+            transcript_id = f"fake-{next(self._job_ids)}"
+            self._jobs[transcript_id] = time.monotonic() + self.latency_s
+        return transcript_id
+
+    def get_transcription(self, transcript_id: str):
+        ready_at = self._jobs.get(transcript_id)
+        if ready_at is None:
+            return "error", None, "Unknown transcript id"
+        if time.monotonic() < ready_at:
+            return "processing", None, None
+        del self._jobs[transcript_id]
+        if self._should_fail():
+            return "error", None, "Injected transcription failure"
+        return "completed", self.next_utterance(), None
+
+
+class FakeLLMProvider(_Fake, LLMProvider):
+    """Echo-style replies of a few sentences, streamed in `chunk_chars` pieces."""
+    name = "fake"
+
+    def __init__(self, chunk_chars: int = 12, **kwargs):
+        super().__init__(**kwargs)
+        self.chunk_chars = chunk_chars
+
+    @staticmethod
+    def reply_for(user_query: str) -> str:
+        return (
+            f"You said: {user_query.strip()}. "
+            "This is a local test response. "
+            "It has a few sentences so streaming and sentence splitting get exercised."
+        )
+
+    def stream_llm_response(self, user_query: str, history: List[Dict[str, Any]]) -> Iterator[str]:
+        reply = self.reply_for(user_query)
+        time.sleep(self.first_byte_s)
+        self._maybe_fail("LLM")
+        for i in range(0, len(reply), self.chunk_chars):
+            if i:
+                time.sleep(self.chunk_interval_s)
+            yield reply[i:i + self.chunk_chars]
+
+    def get_llm_response(self, user_query: str, history: List[Dict[str, Any]]):
+        reply = "".join(self.stream_llm_response(user_query, history))
+        return reply, append_turn(history, user_query, reply)
+
+    async def aget_llm_response(self, user_query: str, history: List[Dict[str, Any]]):
+        if self.blocking:
+            return await super().aget_llm_response(user_query, history)
+        reply = self.reply_for(user_query)
+        chunks = -(-len(reply) // self.chunk_chars)
+        await asyncio.sleep(self.first_byte_s + self.chunk_interval_s * (chunks - 1))
+        self._maybe_fail("LLM")
+        return reply, append_turn(history, user_query, reply)
+
+    async def astream_llm_response(self, user_query: str, history: List[Dict[str, Any]]):
+        if self.blocking:
+            async for chunk in super().astream_llm_response(user_query, history):
+                yield chunk
+            return
+        reply = self.reply_for(user_query)
+        await asyncio.sleep(self.first_byte_s)
+        self._maybe_fail("LLM")
+        for i in range(0, len(reply), self.chunk_chars):
+            if i:
+                await asyncio.sleep(self.chunk_interval_s)
+            yield reply[i:i + self.chunk_chars]
+
+
+class FakeTTSProvider(_Fake, TTSProvider):
+    """Returns a WAV tone (60 ms per character of text), streamed in `chunk_bytes` pieces."""
+    name = "fake"
+    SAMPLE_RATE = 16000
+    MS_PER_CHAR = 60
+
+    def __init__(self, chunk_bytes: int = 4096, **kwargs):
+        super().__init__(**kwargs)
+        self.chunk_bytes = chunk_bytes
+
+    def synthesize(self, text: str) -> bytes:
+        n = self.SAMPLE_RATE * self.MS_PER_CHAR * max(1, len(text)) // 1000
+        t = np.arange(n) / self.SAMPLE_RATE
+        pcm = (3000 * np.sin(2 * np.pi * 220 * t)).astype("<i2")
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.SAMPLE_RATE)
+            w.writeframes(pcm.tobytes())
+        return buf.getvalue()
+
+    def stream_speech(self, text: str) -> Iterator[bytes]:
+        audio = self.synthesize(text)
+        time.sleep(self.first_byte_s)
+        self._maybe_fail("TTS")
+        for i in range(0, len(audio), self.chunk_bytes):
+            if i:
+                time.sleep(self.chunk_interval_s)
+            yield audio[i:i + self.chunk_bytes]
+
+    async def astream_speech(self, text: str):
+        if self.blocking:
+            async for chunk in super().astream_speech(text):
+                yield chunk
+            return
+        audio = self.synthesize(text)
+        await asyncio.sleep(self.first_byte_s)
+        self._maybe_fail("TTS")
+        for i in range(0, len(audio), self.chunk_bytes):
+            if i:
+                await asyncio.sleep(self.chunk_interval_s)
+            yield audio[i:i + self.chunk_bytes]
+
+    async def aspeak(self, text: str) -> bytes:
+        if self.blocking:
+            return await super().aspeak(text)
+        audio = self.synthesize(text)
+        chunks = -(-len(audio) // self.chunk_bytes)
+        await asyncio.sleep(self.first_byte_s + self.chunk_interval_s * (chunks - 1))
+        self._maybe_fail("TTS")
+        return audio
+
+    def convert_text_to_speech(self, text: str, voice_id: str = "en-US-natalie") -> str:
+        time.sleep(self.latency_s)
+        self._maybe_fail("TTS")
+        return "/static/fallback.mp3"
+
+    async def aconvert_text_to_speech(self, text: str, voice_id: str = "en-US-natalie") -> str:
+        if self.blocking:
+            return await super().aconvert_text_to_speech(text, voice_id)
+        await asyncio.sleep(self.latency_s)
+        self._maybe_fail("TTS")
+        return "/static/fallback.mp3"
+
+    def get_available_voices(self) -> List[Dict[str, Any]]:
+        time.sleep(self.latency_s)
+        self._maybe_fail("voices")
+        return [
+            {"voiceId": "en-US-natalie", "displayName": "Natalie (F)", "locale": "en-US"},
+            {"voiceId": "en-US-ken", "displayName": "Ken (M)", "locale": "en-US"},
+        ]
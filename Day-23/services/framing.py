@@ -0,0 +1,88 @@
+# services/framing.py
+from typing import List
+
+
+class PCMReframer:
+    """
+    Per-session ring buffer that re-frames uplink PCM blocks of any size into
+    fixed-duration frames sized for the STT provider (50-100 ms works best).
+
+    Incoming blocks are copied once into a preallocated ring, and each frame
+    is copied out once, as bytes: frames sit in the STT send queue after the
+    ring slot is reused, so a view into the ring would be overwritten. The
+    capacity is a whole number of frames and the read position only ever
+    advances by one frame, so a frame never wraps around the end of the ring
+    and is taken with a single slice, without concatenating blocks.
+    """
+
+    def __init__(
+        self,
+        frame_ms: int = 50,
+        sample_rate: int = 16000,
+        sample_width: int = 2,
+        capacity_frames: int = 32,
+    ):
+        self.frame_bytes = sample_rate * frame_ms // 1000 * sample_width
+        self._buf = bytearray(self.frame_bytes * capacity_frames)
+        self._view = memoryview(self._buf)
+        self._read = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, needed: int):
+        """Reallocates the ring (rare: only when a block outruns the reader)."""
+        capacity = len(self._buf)
+        while capacity < needed:
+            capacity *= 2
+        data = self._peek(self._size)
+        self._view.release()
+        self._buf = bytearray(capacity)
+        self._buf[: len(data)] = data
+        self._view = memoryview(self._buf)
+        self._read = 0
+
+    def _peek(self, n: int) -> bytes:
+        end = self._read + n
+        if end <= len(self._buf):
+            return bytes(self._view[self._read:end])
+        return bytes(self._view[self._read:]) + bytes(self._view[: end - len(self._buf)])
+
+    def write(self, data: bytes):
+        """Appends one uplink block to the ring."""
+        n = len(data)
+        if self._size + n > len(self._buf):
+            self._grow(self._size + n)
+
+        capacity = len(self._buf)
+        start = (self._read + self._size) % capacity
+        first = min(n, capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < n:
+            self._view[: n - first] = data[first:]
+        self._size += n
+
+    def read_frame(self) -> bytes:
+        """Returns a copy of the next full frame, or b"" if less than a frame is buffered."""
+        if self._size < self.frame_bytes:
+            return b""
+        frame = bytes(self._view[self._read:self._read + self.frame_bytes])
+        self._read = (self._read + self.frame_bytes) % len(self._buf)
+        self._size -= self.frame_bytes
+        return frame
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Writes a block and returns every full frame now available."""
+        self.write(data)
+        frames = []
+        while self._size >= self.frame_bytes:
+            frames.append(self.read_frame())
+        return frames
+
+    def flush(self) -> bytes:
+        """Returns whatever partial frame is left and empties the ring."""
+        tail = self._peek(self._size) if self._size else b""
+        self._read = 0
+        self._size = 0
+        return tail
@@ -0,0 +1,218 @@
+# services/jobs.py
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+from uuid import uuid4
+
+from services.executors import CountingExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when the job service already holds its maximum number of pending jobs."""
+
+
+class TranscriptionJob:
+    __slots__ = ("id", "path", "status", "text", "error", "created_at", "finished_at", "done")
+
+    def __init__(self, path: str):
+        self.id = uuid4().hex
+        self.path = path
+        self.status = "queued"
+        self.text: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "text": self.text,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class TranscriptionJobService:
+    """
+    Asynchronous batch file transcription.
+
+    `submit()` returns a job at once; a fixed pool of worker tasks uploads the
+    file (`submit_fn`, on a bounded thread pool) and then polls the provider
+    (`poll_fn`) with exponential backoff. Waiting between polls is an
+    `asyncio.sleep`, so no thread is held while the provider works. A job
+    still processing `max_poll_s` after upload is failed, which frees its
+    worker. Results are read by polling `get()` or by awaiting `job.done`.
+
+    Jobs and their results live in this process only. Under several uvicorn
+    workers a status poll can reach a worker that never saw the job and get
+    a 404, and a restart forgets every job: run the job endpoints on one
+    worker, or route a client's requests to the same worker.
+    """
+
+    def __init__(
+        self,
+        submit_fn: Callable[[str], str],
+        poll_fn: Callable[[str], Tuple[str, Optional[str], Optional[str]]],
+        workers: int = 4,
+        max_pending: int = 100,
+        poll_initial_s: float = 1.0,
+        poll_max_s: float = 10.0,
+        max_poll_s: float = 1800.0,
+        result_ttl_s: float = 3600.0,
+    ):
+        self.submit_fn = submit_fn
+        self.poll_fn = poll_fn
+        self.workers = workers
+        self.max_pending = max_pending
+        self.poll_initial_s = poll_initial_s
+        self.poll_max_s = poll_max_s
+        self.max_poll_s = max_poll_s
+        self.result_ttl_s = result_ttl_s
+
+        self._jobs: Dict[str, TranscriptionJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._executor = CountingExecutor(max_workers=workers, thread_name_prefix="stt-job")
+
+        # Throughput metrics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cached = 0
+        self.in_flight = 0
+        self._finish_times = deque()
+        self._total_seconds = 0.0
+
+    def _ensure_workers(self):
+        # Workers are started lazily so they bind to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, path: str) -> TranscriptionJob:
+        """Queues a saved audio file for transcription and returns its job immediately."""
+        self._ensure_workers()
+        self._evict_finished()
+        if self.queue_depth() >= self.max_pending:
+            self.rejected += 1
+            raise JobQueueFull(f"{self.max_pending} transcription jobs already pending")
+
+        job = TranscriptionJob(path)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self.submitted += 1
+        return job
+
+    def complete_cached(self, text: str) -> TranscriptionJob:
+        """Registers a job that is already done, for uploads whose transcript is cached."""
+        self._evict_finished()
+        job = TranscriptionJob(path="")
+        self._jobs[job.id] = job
+        job.status = "completed"
+        job.text = text
+        job.finished_at = job.created_at
+        job.done.set()
+        self.cached += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        """Jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue else 0
+
+    def executor_stats(self) -> Dict[str, int]:
+        """Upload/poll thread pool saturation: queued calls, running calls and max threads."""
+        return self._executor.stats()
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            self.in_flight += 1
+            try:
+                job.status = "uploading"
+                transcript_id = await loop.run_in_executor(self._executor, self.submit_fn, job.path)
+
+                job.status = "processing"
+                delay = self.poll_initial_s
+                deadline = time.monotonic() + self.max_poll_s
+                while True:
+                    await asyncio.sleep(delay)
+                    status, text, error = await loop.run_in_executor(self._executor, self.poll_fn, transcript_id)
+                    if status == "completed":
+                        self._finish(job, "completed", text=text or "")
+                        break
+                    if status == "error":
+                        self._finish(job, "error", error=error or "Transcription failed")
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        logger.warning(f"Transcription job {job.id} still {status!r} after {self.max_poll_s:g}s, giving up")
+                        self._finish(job, "error", error=f"Transcription timed out after {self.max_poll_s:g}s")
+                        break
+                    delay = min(delay * 2, self.poll_max_s, remaining)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Transcription job {job.id} failed: {e}")
+                self._finish(job, "error", error=str(e))
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+                try:
+                    os.remove(job.path)
+                except OSError:
+                    pass
+
+    def _finish(self, job: TranscriptionJob, status: str, text: Optional[str] = None, error: Optional[str] = None):
+        job.status = status
+        job.text = text
+        job.error = error
+        job.finished_at = time.time()
+        job.done.set()
+        if status == "completed":
+            self.completed += 1
+        else:
+            self.failed += 1
+        self._total_seconds += job.finished_at - job.created_at
+        self._finish_times.append(job.finished_at)
+        self._trim_finish_times(job.finished_at)
+
+    def _trim_finish_times(self, now: float):
+        # Only the last minute feeds jobs_per_minute
+        while self._finish_times and self._finish_times[0] < now - 60:
+            self._finish_times.popleft()
+
+    def _evict_finished(self):
+        cutoff = time.time() - self.result_ttl_s
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        now = time.time()
+        self._trim_finish_times(now)
+        finished = self.completed + self.failed
+        return {
+            "workers": self.workers,
+            "queued": self.queue_depth(),
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "cached": self.cached,
+            "jobs_per_minute": len(self._finish_times),
+            "mean_job_seconds": round(self._total_seconds / finished, 2) if finished else 0.0,
+        }
@@ -1,7 +1,7 @@
 # services/llm.py
 import google.generativeai as genai
 import os
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Tuple
 
 # Configure logging
 import logging
@@ -35,4 +35,21 @@ def get_llm_response(user_query: str, history: List[Dict[str, Any]]) -> Tuple[st
         return response.text, chat.history
     except Exception as e:
         logger.error(f"Error getting LLM response: {e}")
-        return "I'm sorry, I encountered an error while processing your request.", history
\ No newline at end of file
+        return "I'm sorry, I encountered an error while processing your request.", history
+
+
+def stream_llm_response(user_query: str, history: List[Dict[str, Any]]) -> Iterator[str]:
+    """Yields Gemini text chunks for one chat turn as they arrive."""
+    model = genai.GenerativeModel('gemini-1.5-flash', system_instruction=system_instructions)
+    chat = model.start_chat(history=history)
+    for chunk in chat.send_message(user_query, stream=True):
+        if getattr(chunk, "text", None):
+            yield chunk.text
+
+
+def append_turn(history: List[Dict[str, Any]], user_query: str, response_text: str) -> List[Dict[str, Any]]:
+    """Returns the history extended with one user/model exchange, in Gemini's dict format."""
+    return list(history) + [
+        {"role": "user", "parts": [user_query]},
+        {"role": "model", "parts": [response_text]},
+    ]
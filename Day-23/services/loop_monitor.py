@@ -0,0 +1,103 @@
+# services/loop_monitor.py
+"""
+Event loop watchdog: measures loop lag continuously and catches blocking calls.
+
+A sampler coroutine sleeps `interval_ms` at a time; how late it wakes up is
+the loop lag, recorded in a histogram. A daemon thread watches the sampler's
+heartbeat; once the loop has not come back for `threshold_ms`, it snapshots
+the loop thread's stack with sys._current_frames(), which shows the blocking
+call while it is still running. The stall is recorded (duration, stack) when
+the loop resumes.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import List, Optional
+
+from services.tracing import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Lag upper bounds in ms; the last bucket is +Inf
+LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LoopMonitor:
+    def __init__(self, interval_ms: float = 50, threshold_ms: float = 100, max_stalls: int = 50):
+        self.interval_s = interval_ms / 1000
+        self.threshold_s = threshold_ms / 1000
+        self.lag = Histogram(LAG_BUCKETS_MS)
+        self.stalls = 0
+        self.recent_stalls: deque = deque(maxlen=max_stalls)
+
+        self._heartbeat = time.perf_counter()
+        self._stack: Optional[List[str]] = None  # captured by the watchdog, consumed by the sampler
+        self._lock = threading.Lock()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Starts sampling the running loop and the watchdog thread."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            now = time.perf_counter()
+            lag_s = max(now - started - self.interval_s, 0.0)
+            self.lag.observe(lag_s * 1000)
+            with self._lock:
+                self._heartbeat = now
+                stack, self._stack = self._stack, None
+            if lag_s >= self.threshold_s:
+                self._record_stall(lag_s, stack)
+
+    def _watch(self):
+        captured_for = None
+        poll_s = max(self.threshold_s / 4, 0.005)
+        while not self._stop.wait(poll_s):
+            with self._lock:
+                heartbeat = self._heartbeat
+                if heartbeat == captured_for or time.perf_counter() - heartbeat < self.interval_s + self.threshold_s:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread)
+                self._stack = traceback.format_stack(frame) if frame is not None else None
+                captured_for = heartbeat  # one stack per stall
+
+    def _record_stall(self, lag_s: float, stack: Optional[List[str]]):
+        self.stalls += 1
+        stall = {
+            "at": time.time(),
+            "blocked_ms": round(lag_s * 1000, 1),
+            "stack": [line.rstrip() for line in stack] if stack else None,
+        }
+        self.recent_stalls.append(stall)
+        where = "".join(stack[-3:]) if stack else "  (stack not captured)\n"
+        logger.warning(f"Event loop blocked for {stall['blocked_ms']} ms, innermost frames:\n{where}")
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval_s * 1000,
+            "threshold_ms": self.threshold_s * 1000,
+            "lag": {**self.lag.snapshot(), "max_ms": round(self.lag.max, 1)},
+            "stalls": self.stalls,
+            "recent_stalls": list(self.recent_stalls),
+        }
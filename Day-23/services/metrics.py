@@ -0,0 +1,213 @@
+# services/metrics.py
+"""
+Prometheus-style metrics for the voice pipeline, rendered by GET /metrics
+in the text exposition format (no client library needed).
+
+Counters and up/down gauges never take a lock on the hot path: each thread
+adds to its own cell and a scrape sums the cells. The audio path pays a
+dict lookup and an add per update.
+"""
+import threading
+from contextlib import contextmanager
+from threading import get_ident
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from services.tracing import Histogram
+
+
+class _ThreadCells:
+    """A number split into one cell per writing thread; only the owner thread writes a cell."""
+    __slots__ = ("_cells", "_lock")
+
+    def __init__(self):
+        self._cells: Dict[int, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, n: float):
+        cell = self._cells.get(get_ident())
+        if cell is None:
+            with self._lock:  # once per thread
+                cell = self._cells.setdefault(get_ident(), [0])
+        cell[0] += n
+
+    def value(self) -> float:
+        return sum(cell[0] for cell in list(self._cells.values()))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 fn: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.fn = fn  # computes {label values: value} at scrape time instead of counting
+        self._children: Dict[Tuple[str, ...], _ThreadCells] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames and fn is None:
+            self._cells(())  # an unlabeled series is exported as 0 before its first update
+        REGISTRY.append(self)
+
+    def _cells(self, labels: Tuple[str, ...]) -> _ThreadCells:
+        cells = self._children.get(labels)
+        if cells is None:
+            with self._lock:
+                cells = self._children.setdefault(labels, _ThreadCells())
+        return cells
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        if self.fn is not None:
+            return [(self.name, labels, value) for labels, value in self.fn().items()]
+        return [(self.name, labels, cells.value()) for labels, cells in list(self._children.items())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, n: float = 1, *labels: str):
+        self._cells(labels).add(n)
+
+
+class Gauge(_Metric):
+    """Up/down gauge, or (with `fn`) a value computed at scrape time."""
+    kind = "gauge"
+
+    def inc(self, n: float = 1, *labels: str):
+        self._cells(labels).add(n)
+
+    def dec(self, n: float = 1, *labels: str):
+        self._cells(labels).add(-n)
+
+
+class HistogramMetric(_Metric):
+    """Exports tracing.Histogram instances (keyed by label values) with cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 source: Callable[[], Dict[Tuple[str, ...], Histogram]], scale: float = 1.0):
+        super().__init__(name, documentation, labelnames)
+        self.source = source
+        self.scale = scale  # e.g. 0.001 to export ms histograms in seconds
+
+    def samples(self):
+        out = []
+        for labels, hist in list(self.source().items()):
+            cumulative = 0
+            for bound, n in zip(hist.buckets, hist.counts):
+                cumulative += n
+                out.append((f"{self.name}_bucket", labels + (_fmt(bound * self.scale),), cumulative))
+            out.append((f"{self.name}_bucket", labels + ("+Inf",), hist.count))
+            out.append((f"{self.name}_sum", labels, hist.sum * self.scale))
+            out.append((f"{self.name}_count", labels, hist.count))
+        return out
+
+
+REGISTRY: List[_Metric] = []
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render() -> str:
+    """Renders every registered metric in the Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        names = metric.labelnames + (("le",) if metric.kind == "histogram" else ())
+        for sample_name, labels, value in metric.samples():
+            if labels:
+                pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, labels))
+                lines.append(f"{sample_name}{{{pairs}}} {_fmt(value)}")
+            else:
+                lines.append(f"{sample_name} {_fmt(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Pipeline metrics -------------------------------------------------------
+
+ACTIVE_WEBSOCKETS = Gauge("voice_active_websockets", "Open /ws voice sessions.")
+OPEN_PROVIDER_CALLS = Gauge(
+    "voice_open_provider_connections",
+    "Open STT streams and in-flight STT/LLM/TTS provider calls.",
+    ("kind",),
+)
+PROVIDER_CALLS = Counter("voice_provider_calls_total", "Provider calls started.", ("kind",))
+PROVIDER_ERRORS = Counter("voice_provider_errors_total", "Provider calls that raised or timed out.", ("kind",))
+HTTP_REQUESTS = Counter("voice_http_requests_total", "HTTP requests by route and status.", ("route", "status"))
+STT_FRAMES = Counter(
+    "voice_stt_frames_total",
+    "Uplink frames leaving the per-session STT send queue, by outcome (sent, dropped_silence, dropped_speech).",
+    ("outcome",),
+)
+WS_BYTES = Counter("voice_ws_bytes_total", "Websocket payload bytes by direction (in = uplink audio).", ("direction",))
+
+SESSION_BYTE_BUCKETS = (64e3, 256e3, 1e6, 4e6, 16e6, 64e6, 256e6)
+_session_bytes: Dict[Tuple[str, ...], Histogram] = {}
+_session_bytes_lock = threading.Lock()
+HistogramMetric(
+    "voice_ws_session_bytes",
+    "Bytes moved per finished /ws session, by direction.",
+    ("direction",),
+    source=lambda: _session_bytes,
+)
+
+
+def observe_session_bytes(bytes_in: int, bytes_out: int):
+    with _session_bytes_lock:  # once per session, not per frame
+        for direction, n in (("in", bytes_in), ("out", bytes_out)):
+            hist = _session_bytes.get((direction,))
+            if hist is None:
+                hist = _session_bytes[(direction,)] = Histogram(SESSION_BYTE_BUCKETS)
+            hist.observe(n)
+
+
+@contextmanager
+def provider_call(kind: str):
+    """Counts one provider call as open while it runs, and as an error if it raises."""
+    PROVIDER_CALLS.inc(1, kind)
+    OPEN_PROVIDER_CALLS.inc(1, kind)
+    try:
+        yield
+    except Exception:  # cancellations are not provider errors
+        PROVIDER_ERRORS.inc(1, kind)
+        raise
+    finally:
+        OPEN_PROVIDER_CALLS.dec(1, kind)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware counting HTTP requests by route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUESTS.inc(1, getattr(route, "path", "unmatched"), str(status["code"]))
+
+
+def executor_gauges(pools: Dict[str, Callable[[], Dict[str, int]]]) -> Callable[[], Dict[Tuple[str, ...], float]]:
+    """Scrape-time worker pool saturation, from each pool's `executor_stats()` (queued, running, max_threads)."""
+    def collect():
+        return {(pool, state): value for pool, stats in pools.items() for state, value in stats().items()}
+    return collect
+
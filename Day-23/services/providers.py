@@ -0,0 +1,271 @@
+# services/providers.py
+"""
+Provider interfaces for the three pipeline stages (STT, LLM, TTS) and the
+factory that picks an implementation from config:
+
+    STT_PROVIDER = assemblyai | fake | replay
+    LLM_PROVIDER = gemini     | fake | replay
+    TTS_PROVIDER = murf       | fake | replay
+
+The fakes (services/fakes.py) are deterministic and run without network,
+so latency and throughput work can be measured reproducibly offline. The
+replay providers (services/replay.py) play back a recorded session.
+"""
+import asyncio
+import functools
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+import config
+from services import stt, llm, tts
+from services.executors import CountingExecutor
+
+
+# Blocking SDK calls run here, so async routes never block the event loop
+_executor = CountingExecutor(max_workers=config.PROVIDER_THREADS, thread_name_prefix="provider")
+
+
+def executor_stats() -> Dict[str, int]:
+    """Provider pool saturation: queued calls, running calls and max threads."""
+    return _executor.stats()
+
+
+async def run_blocking(fn: Callable, *args, **kwargs):
+    """Runs a blocking provider call on the provider thread pool and awaits it."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def iterate_blocking(fn: Callable[..., Iterator], *args) -> AsyncIterator:
+    """
+    Drives a blocking iterator (e.g. an SDK stream) on the provider thread
+    pool and yields its items on the event loop as they arrive. If the
+    consumer stops early, the worker thread stops at the next item.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+    end = object()
+
+    def produce():
+        try:
+            for item in fn(*args):
+                if stopped.is_set():
+                    return
+                loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+            loop.call_soon_threadsafe(queue.put_nowait, (end, None))
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, (end, e))
+
+    loop.run_in_executor(_executor, produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+class StreamingTranscriber(ABC):
+    """A live STT session: feed PCM with `stream_audio`, results arrive via callbacks."""
+
+    @abstractmethod
+    def stream_audio(self, audio_chunk: bytes):
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self):
+        raise NotImplementedError
+
+
+class STTProvider(ABC):
+    """
+    Speech-to-text. Streaming is required; the batch methods (whole-file
+    transcription and submit/poll jobs) are optional and raise
+    NotImplementedError where a provider has no batch API.
+    """
+    name = "base"
+
+    @abstractmethod
+    def create_streaming_transcriber(
+        self,
+        sample_rate: int = 16000,
+        on_partial_callback: Optional[Callable[[str], None]] = None,
+        on_final_callback: Optional[Callable[[str], None]] = None,
+    ) -> StreamingTranscriber:
+        raise NotImplementedError
+
+    def transcribe_audio(self, audio_file) -> str:
+        """Transcribes a whole uploaded file (blocking)."""
+        raise NotImplementedError
+
+    async def atranscribe_audio(self, audio_file) -> str:
+        return await run_blocking(self.transcribe_audio, audio_file)
+
+    def submit_transcription(self, audio_path: str) -> str:
+        """Queues a file for transcription without waiting; returns a transcript id."""
+        raise NotImplementedError
+
+    def get_transcription(self, transcript_id: str) -> Tuple[str, Optional[str], Optional[str]]:
+        """Polls a submitted transcript once; returns (status, text, error)."""
+        raise NotImplementedError
+
+
+class LLMProvider(ABC):
+    name = "base"
+
+    @abstractmethod
+    def get_llm_response(self, user_query: str, history: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Returns the full reply and the updated history."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream_llm_response(self, user_query: str, history: List[Dict[str, Any]]) -> Iterator[str]:
+        """Yields reply text chunks as they are generated."""
+        raise NotImplementedError
+
+    async def aget_llm_response(self, user_query: str, history: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        return await run_blocking(self.get_llm_response, user_query, history)
+
+    def astream_llm_response(self, user_query: str, history: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        return iterate_blocking(self.stream_llm_response, user_query, history)
+
+
+class TTSProvider(ABC):
+    """Text-to-speech. `stream_speech` is required; file URLs and the voice list are optional."""
+    name = "base"
+
+    @abstractmethod
+    def stream_speech(self, text: str) -> Iterator[bytes]:
+        """Yields audio chunks (a WAV stream) as they are synthesized."""
+        raise NotImplementedError
+
+    def speak(self, text: str) -> bytes:
+        """Returns the complete audio for the text."""
+        return b"".join(self.stream_speech(text))
+
+    def convert_text_to_speech(self, text: str, voice_id: str = "en-US-natalie") -> str:
+        """Synthesizes the text and returns a URL to the audio file."""
+        raise NotImplementedError
+
+    def astream_speech(self, text: str) -> AsyncIterator[bytes]:
+        return iterate_blocking(self.stream_speech, text)
+
+    async def aspeak(self, text: str) -> bytes:
+        return await run_blocking(self.speak, text)
+
+    async def aconvert_text_to_speech(self, text: str, voice_id: str = "en-US-natalie") -> str:
+        return await run_blocking(self.convert_text_to_speech, text, voice_id)
+
+    def get_available_voices(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class AssemblyAISTTProvider(STTProvider):
+    name = "assemblyai"
+
+    def create_streaming_transcriber(self, sample_rate=16000, on_partial_callback=None, on_final_callback=None):
+        return stt.AssemblyAIStreamingTranscriber(
+            sample_rate=sample_rate,
+            on_partial_callback=on_partial_callback,
+            on_final_callback=on_final_callback,
+        )
+
+    def transcribe_audio(self, audio_file) -> str:
+        return stt.transcribe_audio(audio_file)
+
+    def submit_transcription(self, audio_path: str) -> str:
+        return stt.submit_transcription(audio_path)
+
+    def get_transcription(self, transcript_id: str):
+        return stt.get_transcription(transcript_id)
+
+
+class GeminiLLMProvider(LLMProvider):
+    name = "gemini"
+
+    def get_llm_response(self, user_query, history):
+        return llm.get_llm_response(user_query, history)
+
+    def stream_llm_response(self, user_query, history):
+        return llm.stream_llm_response(user_query, history)
+
+
+class MurfTTSProvider(TTSProvider):
+    name = "murf"
+
+    def stream_speech(self, text: str) -> Iterator[bytes]:
+        return tts.stream_speech(text)
+
+    def speak(self, text: str) -> bytes:
+        return tts.speak(text)
+
+    def convert_text_to_speech(self, text: str, voice_id: str = "en-US-natalie") -> str:
+        return tts.convert_text_to_speech(text, voice_id)
+
+    def get_available_voices(self):
+        return tts.get_available_voices()
+
+
+def _fake_options() -> dict:
+    return {
+        "latency_s": config.FAKE_LATENCY_S,
+        "first_byte_s": config.FAKE_FIRST_BYTE_S,
+        "chunk_interval_s": config.FAKE_CHUNK_INTERVAL_S,
+        "error_rate": config.FAKE_ERROR_RATE,
+        "seed": config.FAKE_SEED,
+        "blocking": config.FAKE_BLOCKING,
+    }
+
+
+_providers: Dict[str, Any] = {}
+
+
+def get_stt_provider() -> STTProvider:
+    if "stt" not in _providers:
+        if config.STT_PROVIDER == "fake":
+            from services.fakes import FakeSTTProvider
+            _providers["stt"] = FakeSTTProvider(**_fake_options())
+        elif config.STT_PROVIDER == "replay":
+            from services.replay import ReplaySTTProvider
+            _providers["stt"] = ReplaySTTProvider(config.REPLAY_FILE)
+        elif config.STT_PROVIDER == "assemblyai":
+            _providers["stt"] = AssemblyAISTTProvider()
+        else:
+            raise ValueError(f"Unknown STT_PROVIDER: {config.STT_PROVIDER}")
+    return _providers["stt"]
+
+
+def get_llm_provider() -> LLMProvider:
+    if "llm" not in _providers:
+        if config.LLM_PROVIDER == "fake":
+            from services.fakes import FakeLLMProvider
+            _providers["llm"] = FakeLLMProvider(chunk_chars=config.FAKE_LLM_CHUNK_CHARS, **_fake_options())
+        elif config.LLM_PROVIDER == "replay":
+            from services.replay import ReplayLLMProvider
+            _providers["llm"] = ReplayLLMProvider(config.REPLAY_FILE)
+        elif config.LLM_PROVIDER == "gemini":
+            _providers["llm"] = GeminiLLMProvider()
+        else:
+            raise ValueError(f"Unknown LLM_PROVIDER: {config.LLM_PROVIDER}")
+    return _providers["llm"]
+
+
+def get_tts_provider() -> TTSProvider:
+    if "tts" not in _providers:
+        if config.TTS_PROVIDER == "fake":
+            from services.fakes import FakeTTSProvider
+            _providers["tts"] = FakeTTSProvider(chunk_bytes=config.FAKE_TTS_CHUNK_BYTES, **_fake_options())
+        elif config.TTS_PROVIDER == "replay":
+            from services.replay import ReplayTTSProvider
+            _providers["tts"] = ReplayTTSProvider(config.REPLAY_FILE)
+        elif config.TTS_PROVIDER == "murf":
+            _providers["tts"] = MurfTTSProvider()
+        else:
+            raise ValueError(f"Unknown TTS_PROVIDER: {config.TTS_PROVIDER}")
+    return _providers["tts"]
@@ -0,0 +1,169 @@
+# services/recording.py
+"""
+Record /ws sessions for deterministic replay (SESSION_RECORD_DIR, opt-in).
+
+A recording is one gzip stream:
+
+    b"VREC" | version (u8) | meta length (u32) | meta JSON
+    then records: kind (u8) | t_us since session start (u64) | length (u32) | payload
+
+Payloads by kind:
+  AUDIO_IN     raw client websocket bytes
+  TEXT_IN      client control message (UTF-8)
+  STT_PARTIAL  partial transcript (UTF-8), stamped when the provider emitted it
+  STT_FINAL    final transcript (UTF-8)
+  LLM          {"query", "reply", "duration_ms"}, stamped at call start; one
+               record per call, as /ws makes a non-streaming LLM call
+  TTS          {"text", "bytes", "duration_ms", "chunks"}, stamped at call
+               start; "chunks" is [[ms after call start, bytes], ...] per
+               streamed chunk. Audio content is not kept, only its size
+  TURN         {"turn", "status", "stages_ms"} from the turn's trace
+
+The replay providers (services/replay.py) play STT/LLM/TTS back from a
+recording with the recorded timings; benchmarks/replay_session.py drives a
+server with the recorded client input and compares stage latencies.
+"""
+import gzip
+import json
+import logging
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Tuple
+from uuid import uuid4
+
+import config
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VREC"
+VERSION = 1
+_HEADER = struct.Struct("<BI")
+_RECORD = struct.Struct("<BQI")
+
+AUDIO_IN, TEXT_IN, STT_PARTIAL, STT_FINAL, LLM, TTS, TURN = range(1, 8)
+KIND_NAMES = {AUDIO_IN: "audio_in", TEXT_IN: "text_in", STT_PARTIAL: "stt_partial", STT_FINAL: "stt_final",
+              LLM: "llm", TTS: "tts", TURN: "turn"}
+
+# Settings that change how /ws processes a session; stored so a replay server can match them
+SESSION_SETTINGS = (
+    "VAD_ENABLED", "VAD_ENERGY_THRESHOLD_DB", "VAD_HANGOVER_MS", "VAD_PREROLL_MS", "VAD_KEEPALIVE_MS",
+    "STT_FRAME_MS", "STT_SEND_QUEUE_FRAMES",
+    "LOCAL_ENDPOINTING_ENABLED", "ENDPOINT_SILENCE_MS", "ENDPOINT_STABLE_MS",
+)
+
+
+class Record(NamedTuple):
+    kind: int
+    t: float  # seconds since session start
+    payload: bytes
+
+    def json(self) -> Dict[str, Any]:
+        return json.loads(self.payload)
+
+    def text(self) -> str:
+        return self.payload.decode("utf-8")
+
+
+class SessionRecorder:
+    """Appends one session's records to a recording file. Safe to call from provider threads."""
+
+    def __init__(self, path: Path, meta: Dict[str, Any]):
+        self.path = path
+        self._file = gzip.open(path, "wb", compresslevel=1)  # cheap enough for the audio path
+        header = json.dumps(meta).encode()
+        self._file.write(MAGIC + _HEADER.pack(VERSION, len(header)) + header)
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._closed = False
+
+    @classmethod
+    def for_session(cls, directory: str) -> "SessionRecorder":
+        root = Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        path = root / f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:8]}.vrec"
+        meta = {
+            "recorded_at": time.time(),
+            "stt_provider": config.STT_PROVIDER,
+            "llm_provider": config.LLM_PROVIDER,
+            "tts_provider": config.TTS_PROVIDER,
+            "settings": {name: str(getattr(config, name)) for name in SESSION_SETTINGS},
+        }
+        return cls(path, meta)
+
+    def write(self, kind: int, payload: bytes, at: float = None):
+        """Writes one record; `at` is a perf_counter() timestamp, default now."""
+        t_us = int(((time.perf_counter() if at is None else at) - self._t0) * 1e6)
+        with self._lock:
+            if not self._closed:
+                self._file.write(_RECORD.pack(kind, max(t_us, 0), len(payload)) + payload)
+
+    def _write_json(self, kind: int, data: dict, at: float = None):
+        self.write(kind, json.dumps(data).encode(), at)
+
+    def audio_in(self, data: bytes):
+        self.write(AUDIO_IN, data)
+
+    def text_in(self, text: str):
+        self.write(TEXT_IN, text.encode())
+
+    def stt_partial(self, text: str):
+        self.write(STT_PARTIAL, text.encode())
+
+    def stt_final(self, text: str):
+        self.write(STT_FINAL, text.encode())
+
+    def llm_call(self, started: float, query: str, reply: str):
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        self._write_json(LLM, {"query": query, "reply": reply, "duration_ms": duration_ms}, started)
+
+    def tts_call(self, started: float, text: str, nbytes: int, chunks: List[Tuple[float, int]] = ()):
+        """`chunks` holds a (perf_counter(), size) pair per streamed chunk."""
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        offsets = [[round((at - started) * 1000, 1), size] for at, size in chunks]
+        self._write_json(TTS, {"text": text, "bytes": nbytes, "duration_ms": duration_ms, "chunks": offsets}, started)
+
+    def turn(self, trace):
+        self._write_json(TURN, {"turn": trace.turn, "status": trace.status, "stages_ms": trace.stages_ms()})
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._file.close()
+                logger.info(f"Session recorded to {self.path}")
+
+
+def read_recording(path) -> Tuple[Dict[str, Any], List[Record]]:
+    """
+    Returns a recording's meta and its records in write order. LLM and TTS
+    records are written when the call ends but stamped with its start, so
+    sort by `t` for a timeline.
+    """
+    chunks = []
+    with gzip.open(path, "rb") as f:
+        try:
+            while chunk := f.read(1 << 16):
+                chunks.append(chunk)
+        except EOFError:
+            pass  # cut short (e.g. the server was killed); keep the complete records
+    data = b"".join(chunks)
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a session recording")
+    version, meta_len = _HEADER.unpack_from(data, 4)
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported recording version {version}")
+    offset = 4 + _HEADER.size
+    meta = json.loads(data[offset:offset + meta_len])
+    offset += meta_len
+
+    records = []
+    while offset + _RECORD.size <= len(data):
+        kind, t_us, length = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        if offset + length > len(data):
+            break
+        records.append(Record(kind, t_us / 1e6, data[offset:offset + length]))
+        offset += length
+    return meta, records
@@ -0,0 +1,130 @@
+# services/replay.py
+"""
+Replay providers: STT, LLM and TTS played back from a session recording
+(services/recording.py) with the recorded results and timings.
+
+    STT_PROVIDER=replay LLM_PROVIDER=replay TTS_PROVIDER=replay REPLAY_FILE=<file.vrec>
+
+Each streaming transcriber emits the recorded partials and finals at their
+recorded offsets from its creation, which lines up with the session start.
+LLM calls return the recorded reply after blocking for the recorded
+duration. TTS calls stream zeroed audio chunks of the recorded sizes at
+their recorded offsets (one chunk at the end for recordings without chunk
+offsets). Calls are matched by query / sentence text, falling back to
+recording order.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from services import recording
+from services.llm import append_turn
+from services.providers import LLMProvider, StreamingTranscriber, STTProvider, TTSProvider
+
+logger = logging.getLogger(__name__)
+
+
+class _RecordedCalls:
+    """Recorded calls handed out once each: the first unused one for a key, else the next unused."""
+
+    def __init__(self, calls: List[Dict[str, Any]], key: str):
+        self.calls = calls
+        self.key = key
+        self._used = [False] * len(calls)
+        self._lock = threading.Lock()
+
+    def take(self, value: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            unused = [i for i, used in enumerate(self._used) if not used]
+            match = next((i for i in unused if self.calls[i][self.key] == value), unused[0] if unused else None)
+            if match is None:
+                return None
+            self._used[match] = True
+            return self.calls[match]
+
+
+class ReplayStreamingTranscriber(StreamingTranscriber):
+    """Fires the recorded STT events on a timer thread, like the SDK's reader thread."""
+
+    def __init__(self, events: List[recording.Record], on_partial_callback, on_final_callback):
+        self.events = events
+        self.on_partial_callback = on_partial_callback
+        self.on_final_callback = on_final_callback
+        self.received_bytes = 0
+        self._closed = threading.Event()
+        self._t0 = time.perf_counter()
+        threading.Thread(target=self._play, name="replay-stt", daemon=True).start()
+
+    def _play(self):
+        for event in self.events:
+            if self._closed.wait(max(self._t0 + event.t - time.perf_counter(), 0)):
+                return
+            callback = self.on_final_callback if event.kind == recording.STT_FINAL else self.on_partial_callback
+            if callback:
+                callback(event.text())
+
+    def stream_audio(self, audio_chunk: bytes):
+        self.received_bytes += len(audio_chunk)
+
+    def close(self):
+        self._closed.set()
+
+
+class ReplaySTTProvider(STTProvider):
+    name = "replay"
+
+    def __init__(self, path: str):
+        _, records = recording.read_recording(path)
+        self.events = sorted(
+            (r for r in records if r.kind in (recording.STT_PARTIAL, recording.STT_FINAL)), key=lambda r: r.t
+        )
+
+    def create_streaming_transcriber(self, sample_rate=16000, on_partial_callback=None, on_final_callback=None):
+        return ReplayStreamingTranscriber(self.events, on_partial_callback, on_final_callback)
+
+
+class ReplayLLMProvider(LLMProvider):
+    name = "replay"
+
+    def __init__(self, path: str):
+        _, records = recording.read_recording(path)
+        self.calls = _RecordedCalls(
+            [r.json() for r in sorted(records, key=lambda r: r.t) if r.kind == recording.LLM], key="query"
+        )
+
+    def _take(self, user_query: str) -> str:
+        call = self.calls.take(user_query)
+        if call is None:
+            logger.warning(f"Replay has no recorded LLM call left for: {user_query!r}")
+            return ""
+        time.sleep(call["duration_ms"] / 1000)
+        return call["reply"]
+
+    def get_llm_response(self, user_query: str, history: List[Dict[str, Any]]):
+        reply = self._take(user_query)
+        return reply, append_turn(history, user_query, reply)
+
+    def stream_llm_response(self, user_query: str, history: List[Dict[str, Any]]) -> Iterator[str]:
+        yield self._take(user_query)
+
+
+class ReplayTTSProvider(TTSProvider):
+    name = "replay"
+
+    def __init__(self, path: str):
+        _, records = recording.read_recording(path)
+        self.calls = _RecordedCalls(
+            [r.json() for r in sorted(records, key=lambda r: r.t) if r.kind == recording.TTS], key="text"
+        )
+
+    def stream_speech(self, text: str) -> Iterator[bytes]:
+        call = self.calls.take(text)
+        if call is None:
+            logger.warning(f"Replay has no recorded TTS call left for: {text!r}")
+            return
+        started = time.perf_counter()
+        for offset_ms, size in call.get("chunks") or [[call["duration_ms"], call["bytes"]]]:
+            time.sleep(max(started + offset_ms / 1000 - time.perf_counter(), 0))
+            yield bytes(size)
+        time.sleep(max(started + call["duration_ms"] / 1000 - time.perf_counter(), 0))
@@ -0,0 +1,55 @@
+# services/resampler.py
+from math import ceil, gcd
+
+import numpy as np
+
+
+class StreamingResampler:
+    """
+    Streaming polyphase resampler for 16-bit mono PCM (e.g. 48 kHz -> 16 kHz).
+
+    The rational ratio up/down is implemented with a Kaiser-windowed sinc
+    low-pass split into `up` phases. Each call to `process()` computes all
+    output samples for the block in one vectorized gather + dot product, and
+    carries the last taps' worth of input and the fractional output position
+    over to the next block, so frames can be any size with no seams.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int = 16000, zero_crossings: int = 8, beta: float = 8.0):
+        g = gcd(src_rate, dst_rate)
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.up = dst_rate // g
+        self.down = src_rate // g
+
+        # Taps per phase: enough to span `zero_crossings` lobes each side at the lower rate
+        self.taps = max(2, ceil(2 * zero_crossings * max(self.up, self.down) / self.up))
+        n = self.taps * self.up
+        cutoff = 0.5 / max(self.up, self.down) * 0.95  # cycles per upsampled sample, slightly below Nyquist
+        t = np.arange(n) - (n - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, beta)
+        h *= self.up / h.sum()
+        # phases[p, k] = h[k * up + p]
+        self._phases = np.ascontiguousarray(h.reshape(self.taps, self.up).T, dtype=np.float32)
+        self._offsets = np.arange(self.taps)
+
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._pos = 0  # upsampled position of the next output, relative to the first new input sample
+
+    def process(self, pcm: bytes) -> bytes:
+        """Resamples one block of 16-bit PCM; returns 16-bit PCM at `dst_rate`."""
+        x = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+        if x.size == 0:
+            return b""
+        buf = np.concatenate((self._history, x.astype(np.float32)))
+
+        span = x.size * self.up
+        n_out = max(0, -(-(span - self._pos) // self.down))
+        t = self._pos + self.down * np.arange(n_out)
+        index = (self.taps - 1) + t // self.up
+        windows = buf[index[:, None] - self._offsets]
+        y = np.einsum("ij,ij->i", windows, self._phases[t % self.up])
+
+        self._pos += n_out * self.down - span
+        self._history = buf[buf.size - (self.taps - 1):]
+        return np.clip(np.rint(y), -32768, 32767).astype("<i2").tobytes()
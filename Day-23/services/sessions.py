@@ -0,0 +1,379 @@
+# services/sessions.py
+import asyncio
+import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Rough fixed cost of one stored session (record, buffers, LRU entry, key)
+SESSION_OVERHEAD_BYTES = 350
+
+
+class _Session:
+    """
+    One conversation, stored compactly: every message's UTF-8 text back to
+    back in one buffer, plus the end offset of each message. Messages
+    alternate user, model, user, ... so roles need no storage. Gemini-style
+    dicts are only built by `history()`, right before an LLM call.
+    """
+    __slots__ = ("text", "ends", "last_access")
+
+    def __init__(self):
+        self.text = bytearray()
+        self.ends = array("I")
+        self.last_access = time.monotonic()
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.text) + self.ends.itemsize * len(self.ends) + SESSION_OVERHEAD_BYTES
+
+    def append(self, user_query: str, response_text: str):
+        for message in (user_query, response_text):
+            self.text += message.encode()
+            self.ends.append(len(self.text))
+
+    def history(self) -> List[Dict[str, Any]]:
+        history = []
+        start = 0
+        view = memoryview(self.text)
+        for i, end in enumerate(self.ends):
+            history.append({"role": "model" if i % 2 else "user", "parts": [str(view[start:end], "utf-8")]})
+            start = end
+        return history
+
+
+class SessionStore:
+    """
+    In-memory conversation histories for REST sessions, bounded three ways:
+    sessions idle longer than `idle_ttl_s` expire, at most `max_sessions` are
+    kept, and the size of all histories (text, offsets and a fixed
+    per-session overhead) stays under `max_bytes`.
+    Sessions are kept in LRU order, so whichever limit is hit, the least
+    recently used session goes first.
+    """
+
+    def __init__(self, idle_ttl_s: float = 1800.0, max_sessions: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        self.idle_ttl_s = idle_ttl_s
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self.total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = {"ttl": 0, "count": 0, "bytes": 0}
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """Returns a copy of the session's history ([] for new or expired sessions)."""
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is None:
+            self.misses += 1
+            return []
+        self.hits += 1
+        self._touch(session_id, session)
+        return session.history()
+
+    def append_turn(self, session_id: str, user_query: str, response_text: str):
+        """Records one user/model exchange, then evicts other sessions if over budget."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session()
+            self.total_bytes += SESSION_OVERHEAD_BYTES
+        before = session.nbytes
+        session.append(user_query, response_text)
+        self.total_bytes += session.nbytes - before
+        self._touch(session_id, session)
+        self._enforce_limits()
+
+    def delete(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self.total_bytes -= session.nbytes
+
+    def _touch(self, session_id: str, session: _Session):
+        session.last_access = time.monotonic()
+        self._sessions.move_to_end(session_id)
+
+    def _evict_oldest(self, reason: str):
+        _, session = self._sessions.popitem(last=False)
+        self.total_bytes -= session.nbytes
+        self.evicted[reason] += 1
+
+    def _expire(self):
+        # LRU order means every idle session is at the front
+        cutoff = time.monotonic() - self.idle_ttl_s
+        while self._sessions and next(iter(self._sessions.values())).last_access < cutoff:
+            self._evict_oldest("ttl")
+
+    def _enforce_limits(self):
+        self._expire()
+        while len(self._sessions) > self.max_sessions:
+            self._evict_oldest("count")
+        # Never evict the session that was just written, even if it alone exceeds the budget
+        while self.total_bytes > self.max_bytes and len(self._sessions) > 1:
+            self._evict_oldest("bytes")
+
+    def stats(self) -> dict:
+        self._expire()
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self.total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted_ttl": self.evicted["ttl"],
+            "evicted_count": self.evicted["count"],
+            "evicted_bytes": self.evicted["bytes"],
+        }
+
+
+class SessionBackend(ABC):
+    """
+    Where /agent/chat histories live. A turn waits on one `load()`;
+    `append()` may write behind and carry its write along with the next
+    load, so a networked store (e.g. Redis: RPUSH + EXPIRE + LRANGE in one
+    pipeline) needs one round trip per turn.
+    """
+    name = "base"
+
+    @abstractmethod
+    async def load(self, session_id: str) -> List[Dict[str, Any]]:
+        """Returns the session's history in Gemini's dict format ([] if unknown or expired)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def append(self, session_id: str, user_query: str, response_text: str):
+        """Records one user/model exchange."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        raise NotImplementedError
+
+    async def close(self):
+        """Finishes writes still in flight; called on shutdown."""
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class MemorySessionBackend(SessionBackend):
+    """Per-process SessionStore; fastest, but sessions are lost across workers and restarts."""
+    name = "memory"
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+
+    async def load(self, session_id: str) -> List[Dict[str, Any]]:
+        return self.store.get_history(session_id)
+
+    async def append(self, session_id: str, user_query: str, response_text: str):
+        self.store.append_turn(session_id, user_query, response_text)
+
+    async def delete(self, session_id: str):
+        self.store.delete(session_id)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, **self.store.stats()}
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    Histories in a SQLite file in WAL mode, shared by every worker process on
+    the host. `append()` only queues the turn: queued turns are group
+    committed by a background flush, or written by the next `load()` in the
+    same hop as its SELECT, whichever runs first, so a turn waits on one
+    trip to the database thread. Loads always see this process's queued
+    turns; other workers see them once committed, a few ms later.
+    Sessions idle past `idle_ttl_s` are purged, and the oldest go once more
+    than `max_sessions` exist. All SQLite work runs on one dedicated thread.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str, idle_ttl_s: float = 1800.0, max_sessions: int = 10000, sweep_interval_s: float = 60.0):
+        self.path = path
+        self.idle_ttl_s = idle_ttl_s
+        self.max_sessions = max_sessions
+        self.sweep_interval_s = sweep_interval_s
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending = []
+        self._flushing = False
+        self._tasks = set()
+        self._last_sweep = time.time()
+
+        self.loads = 0
+        self.appends = 0
+        self.batches = 0
+        self.carried = 0
+        self.purged = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Runs on the session-db thread
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    last_access REAL NOT NULL,
+                    turns INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+                CREATE TABLE IF NOT EXISTS turns (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    user_text TEXT NOT NULL,
+                    model_text TEXT NOT NULL,
+                    PRIMARY KEY (session_id, seq)
+                ) WITHOUT ROWID;
+            """)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _load(self, session_id: str, batch: list) -> List[Dict[str, Any]]:
+        self._write_pending(batch)
+        rows = self._connect().execute(
+            "SELECT t.user_text, t.model_text FROM turns t JOIN sessions s ON s.id = t.session_id "
+            "WHERE t.session_id = ? AND s.last_access >= ? ORDER BY t.seq",
+            (session_id, time.time() - self.idle_ttl_s),
+        ).fetchall()
+        history: List[Dict[str, Any]] = []
+        for user_text, model_text in rows:
+            history.append({"role": "user", "parts": [user_text]})
+            history.append({"role": "model", "parts": [model_text]})
+        return history
+
+    async def load(self, session_id: str) -> List[Dict[str, Any]]:
+        self.loads += 1
+        batch, self._pending = self._pending, []
+        self.carried += len(batch)
+        return await self._run(self._load, session_id, batch)
+
+    def _write_pending(self, batch: list):
+        # Runs on the session-db thread. A failed write is logged rather than
+        # raised: the turns were already answered, and a load carrying them
+        # should not fail an unrelated request.
+        if not batch:
+            return
+        self.batches += 1
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            logger.error(f"Session write of {len(batch)} turns failed: {e}")
+
+    def _write_batch(self, batch: list):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for session_id, user_query, response_text, now in batch:
+                # A session that went idle past the TTL starts over
+                conn.execute(
+                    "DELETE FROM turns WHERE session_id = ? AND session_id IN "
+                    "(SELECT id FROM sessions WHERE id = ? AND last_access < ?)",
+                    (session_id, session_id, now - self.idle_ttl_s),
+                )
+                conn.execute(
+                    "INSERT INTO sessions (id, last_access, turns) VALUES (?, ?, 1) "
+                    "ON CONFLICT(id) DO UPDATE SET last_access = excluded.last_access, "
+                    "turns = CASE WHEN sessions.last_access < ? THEN 1 ELSE sessions.turns + 1 END",
+                    (session_id, now, now - self.idle_ttl_s),
+                )
+                conn.execute(
+                    "INSERT INTO turns (session_id, seq, user_text, model_text) "
+                    "VALUES (?, (SELECT turns FROM sessions WHERE id = ?), ?, ?)",
+                    (session_id, session_id, user_query, response_text),
+                )
+            if time.time() - self._last_sweep >= self.sweep_interval_s:
+                self._sweep(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _sweep(self, conn: sqlite3.Connection):
+        self._last_sweep = time.time()
+        cutoff = self._last_sweep - self.idle_ttl_s
+        stale = "SELECT id FROM sessions WHERE last_access < ? OR id IN " \
+                "(SELECT id FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)"
+        conn.execute(f"DELETE FROM turns WHERE session_id IN ({stale})", (cutoff, self.max_sessions))
+        self.purged += conn.execute(f"DELETE FROM sessions WHERE id IN ({stale})", (cutoff, self.max_sessions)).rowcount
+
+    async def append(self, session_id: str, user_query: str, response_text: str):
+        self._pending.append((session_id, user_query, response_text, time.time()))
+        self.appends += 1
+        if not self._flushing:
+            self._flushing = True
+            task = asyncio.ensure_future(self._flush())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self):
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                await self._run(self._write_pending, batch)
+        finally:
+            self._flushing = False
+
+    async def close(self):
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+        if self._pending:
+            batch, self._pending = self._pending, []
+            await self._run(self._write_pending, batch)
+
+    def _delete(self, session_id: str):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        conn.execute("COMMIT")
+
+    async def delete(self, session_id: str):
+        await self._run(self._delete, session_id)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "loads": self.loads,
+            "appends": self.appends,
+            "write_batches": self.batches,
+            "turns_per_batch": round(self.appends / self.batches, 2) if self.batches else 0.0,
+            "carried_appends": self.carried,
+            "purged_sessions": self.purged,
+        }
+
+
+def get_session_backend() -> SessionBackend:
+    """Builds the session backend selected by SESSION_BACKEND ("sqlite" or "memory")."""
+    if config.SESSION_BACKEND == "memory":
+        return MemorySessionBackend(SessionStore(
+            idle_ttl_s=config.SESSION_IDLE_TTL_S,
+            max_sessions=config.SESSION_MAX,
+            max_bytes=config.SESSION_MAX_MB * 1024 * 1024,
+        ))
+    if config.SESSION_BACKEND == "sqlite":
+        return SQLiteSessionBackend(
+            config.SESSION_DB_PATH,
+            idle_ttl_s=config.SESSION_IDLE_TTL_S,
+            max_sessions=config.SESSION_MAX,
+        )
+    raise ValueError(f"Unknown SESSION_BACKEND: {config.SESSION_BACKEND}")
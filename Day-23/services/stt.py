@@ -1,8 +1,14 @@
 # services/stt.py
 import assemblyai as aai
 from fastapi import UploadFile
+import asyncio
+import logging
 import os
+from collections import deque
+from typing import Callable, List, Optional, Tuple
 from dotenv import load_dotenv
+
+from services import metrics
 from assemblyai.streaming.v3 import (
     StreamingClient,
     StreamingClientOptions,
@@ -17,6 +23,8 @@ from assemblyai.streaming.v3 import (
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # expects ASSEMBLYAI_API_KEY in env
 aai.settings.api_key = os.getenv("ASSEMBLYAI_API_KEY") or ""
 
@@ -97,6 +105,125 @@ class AssemblyAIStreamingTranscriber:
         self.client.disconnect(terminate=True)
 
 
+class STTSendQueue:
+    """
+    Bounded per-session queue between the websocket receive loop and the
+    (blocking) provider send call.
+
+    The receive loop only calls `put()`, which never blocks. A dedicated
+    sender task (`run()`) drains the queue in batches and hands each batch to
+    `send` on a worker thread, so a slow provider can neither stall the loop
+    nor grow memory without limit. When the queue is full the oldest silent
+    frame is dropped first; only if every queued frame is speech is the
+    oldest frame dropped. Frames are classified lazily with `is_speech`, so
+    the cost is only paid on overflow.
+
+    If `send` raises, the sender logs the error, stops accepting frames and
+    calls `on_error(exc)` on the event loop so the session can be ended.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], None],
+        max_frames: int = 100,
+        is_speech: Optional[Callable[[bytes], bool]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        self._send = send
+        self._is_speech = is_speech
+        self._on_error = on_error
+        self.max_frames = max_frames
+        self.error: Optional[Exception] = None
+        # Each entry is [frame, is_speech or None when not yet classified]
+        self._frames = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+        # Metrics
+        self.sent_frames = 0
+        self.dropped_silence_frames = 0
+        self.dropped_speech_frames = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._frames)
+
+    @property
+    def dropped_frames(self) -> int:
+        return self.dropped_silence_frames + self.dropped_speech_frames
+
+    def put(self, frame: bytes):
+        """Enqueues a frame without blocking, applying the overflow policy."""
+        if self._closed:
+            return
+        if len(self._frames) >= self.max_frames:
+            self._drop_one()
+        self._frames.append([frame, None])
+        self.max_depth = max(self.max_depth, len(self._frames))
+        self._ready.set()
+
+    def _drop_one(self):
+        if self._is_speech:
+            for i, entry in enumerate(self._frames):
+                if entry[1] is None:
+                    entry[1] = self._is_speech(entry[0])
+                if not entry[1]:
+                    del self._frames[i]
+                    self.dropped_silence_frames += 1
+                    metrics.STT_FRAMES.inc(1, "dropped_silence")
+                    return
+        self._frames.popleft()
+        self.dropped_speech_frames += 1
+        metrics.STT_FRAMES.inc(1, "dropped_speech")
+
+    def _send_batch(self, batch: List[bytes]):
+        for frame in batch:
+            self._send(frame)
+
+    async def run(self):
+        """Sender task: drains the queue until `close()` and the queue is empty."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._frames:
+                if self._closed:
+                    break
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            batch = [entry[0] for entry in self._frames]
+            self._frames.clear()
+            try:
+                await loop.run_in_executor(None, self._send_batch, batch)
+            except Exception as e:
+                logger.error(f"STT send failed, stopping the sender: {e!r}")
+                metrics.PROVIDER_ERRORS.inc(1, "stt_stream")
+                self.error = e
+                self.close()
+                self._frames.clear()
+                if self._on_error:
+                    self._on_error(e)
+                return
+            self.sent_frames += len(batch)
+            metrics.STT_FRAMES.inc(len(batch), "sent")
+
+    def close(self):
+        """Stops accepting frames; `run()` returns once the backlog is sent."""
+        self._closed = True
+        self._ready.set()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "sent_frames": self.sent_frames,
+            "dropped_frames": self.dropped_frames,
+            "dropped_silence_frames": self.dropped_silence_frames,
+            "dropped_speech_frames": self.dropped_speech_frames,
+            "error": repr(self.error) if self.error else None,
+        }
+
+
 def transcribe_audio(audio_file: UploadFile) -> str:
     """Transcribes audio to text using AssemblyAI."""
     transcriber = aai.Transcriber()
@@ -105,4 +232,18 @@ def transcribe_audio(audio_file: UploadFile) -> str:
     if transcript.status == aai.TranscriptStatus.error or not transcript.text:
         raise Exception(f"Transcription failed: {transcript.error or 'No speech detected'}")
 
-    return transcript.text
\ No newline at end of file
+    return transcript.text
+
+
+def submit_transcription(audio_path: str) -> str:
+    """Uploads an audio file and queues it for transcription without waiting; returns the transcript id."""
+    transcript = aai.Transcriber().submit(audio_path)
+    if transcript.status == aai.TranscriptStatus.error:
+        raise Exception(f"Transcription submit failed: {transcript.error}")
+    return transcript.id
+
+
+def get_transcription(transcript_id: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """Polls a submitted transcript once; returns (status, text, error)."""
+    transcript = aai.Transcript.get_by_id(transcript_id)
+    return transcript.status.value, transcript.text, transcript.error
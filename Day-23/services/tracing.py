@@ -0,0 +1,170 @@
+# services/tracing.py
+"""
+Per-turn latency tracing for /ws and /agent/chat.
+
+Each turn gets a TurnTrace stamped (perf_counter) at these points, when the
+path has them:
+
+  audio_received    first speech frame of the turn (ws) / upload received (REST)
+  stt_final         final transcript available
+  llm_first_token   first LLM text (whole reply for non-streaming calls)
+  first_sentence    first complete sentence ready for TTS
+  tts_first_byte    first synthesized audio ready
+  first_audio_sent  first audio sent to the client (REST JSON: audio URL returned)
+  last_audio_sent   last audio sent to the client
+
+Finished traces feed one latency histogram per (path, stage), where a stage
+is the gap between two marks (see STAGES), and are logged as one JSON
+"turn_trace" event on the `voice.trace` logger.
+"""
+import json
+import logging
+import time
+from bisect import bisect_left
+from itertools import count
+from typing import Dict, Optional, Tuple
+
+# Own level, so trace events are emitted even when the root logger is at WARNING
+trace_logger = logging.getLogger("voice.trace")
+trace_logger.setLevel(logging.INFO)
+
+STAGES: Dict[str, Tuple[str, str]] = {
+    "stt": ("audio_received", "stt_final"),
+    "llm_first_token": ("stt_final", "llm_first_token"),
+    "first_sentence": ("stt_final", "first_sentence"),
+    "tts_first_byte": ("first_sentence", "tts_first_byte"),
+    "time_to_first_audio": ("stt_final", "first_audio_sent"),
+    "audio_out": ("first_audio_sent", "last_audio_sent"),
+    "end_to_end": ("audio_received", "last_audio_sent"),
+}
+
+# Upper bounds in ms; the last bucket is +Inf
+BUCKETS_MS = (10, 25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000, 30000)
+
+
+class Histogram:
+    """Fixed-bucket histogram (latency in ms by default) with interpolated percentiles."""
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.sum += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                # Interpolate within the bucket, narrowed to the values actually seen
+                lower = max(self.buckets[i - 1] if i else 0.0, self.min)
+                upper = min(self.buckets[i] if i < len(self.buckets) else self.max, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 1),
+            "p95_ms": round(self.percentile(0.95), 1),
+            "p99_ms": round(self.percentile(0.99), 1),
+        }
+
+
+class TurnTrace:
+    __slots__ = ("tracer", "path", "session_id", "turn", "marks", "status")
+
+    def __init__(self, tracer: "Tracer", path: str, session_id: Optional[str], turn: int):
+        self.tracer = tracer
+        self.path = path
+        self.session_id = session_id
+        self.turn = turn
+        self.marks: Dict[str, float] = {}
+        self.status: Optional[str] = None  # set by finish()
+
+    def mark(self, name: str, at: Optional[float] = None):
+        """Stamps `name` once; later calls for the same mark are ignored."""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() if at is None else at
+
+    def mark_audio_sent(self):
+        now = time.perf_counter()
+        self.marks.setdefault("first_audio_sent", now)
+        self.marks["last_audio_sent"] = now
+
+    def offsets_ms(self) -> Dict[str, float]:
+        """Marks as ms since the earliest one."""
+        if not self.marks:
+            return {}
+        origin = min(self.marks.values())
+        return {name: round((at - origin) * 1000, 1) for name, at in self.marks.items()}
+
+    def stages_ms(self) -> Dict[str, float]:
+        """Durations of the STAGES whose two marks were both stamped."""
+        return {
+            stage: round((self.marks[end] - self.marks[start]) * 1000, 1)
+            for stage, (start, end) in STAGES.items()
+            if start in self.marks and end in self.marks
+        }
+
+    def finish(self, status: str = "ok"):
+        if self.status is None:
+            self.status = status
+            self.tracer.record(self, status)
+
+
+class Tracer:
+    """Hands out TurnTraces and aggregates finished ones into stage histograms."""
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.turns: Dict[Tuple[str, str], int] = {}
+        self._turn_ids = count(1)
+
+    def start(self, path: str, session_id: Optional[str] = None, audio_received: Optional[float] = None) -> TurnTrace:
+        trace = TurnTrace(self, path, session_id, next(self._turn_ids))
+        trace.mark("audio_received", audio_received)
+        return trace
+
+    def record(self, trace: TurnTrace, status: str):
+        key = (trace.path, status)
+        self.turns[key] = self.turns.get(key, 0) + 1
+        stages = trace.stages_ms()
+        # Only completed turns count toward latency; errors and cancellations would skew it
+        if status == "ok":
+            for stage, ms in stages.items():
+                hist = self.histograms.get((trace.path, stage))
+                if hist is None:
+                    hist = self.histograms[(trace.path, stage)] = Histogram()
+                hist.observe(ms)
+        trace_logger.info(json.dumps({
+            "event": "turn_trace",
+            "path": trace.path,
+            "session_id": trace.session_id,
+            "turn": trace.turn,
+            "status": status,
+            "marks_ms": trace.offsets_ms(),
+            "stages_ms": stages,
+        }))
+
+    def stats(self) -> dict:
+        result: Dict[str, dict] = {}
+        for (path, stage), hist in sorted(self.histograms.items()):
+            result.setdefault(path, {})[stage] = hist.snapshot()
+        for (path, status), n in sorted(self.turns.items()):
+            result.setdefault(path, {}).setdefault("turns", {})[status] = n
+        return result
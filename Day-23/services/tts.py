@@ -1,6 +1,6 @@
 # services/tts.py
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from config import MURF_API_KEY # Import the key from config
 from murf import Murf
 from pathlib import Path
@@ -11,6 +11,10 @@ logger = logging.getLogger(__name__)
 
 MURF_API_URL = "https://api.murf.ai/v1/speech"
 
+# Reused across calls so repeated requests (e.g. /tts/batch) keep their TLS connections alive
+_session = requests.Session()
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=32))
+
 # Ensure uploads folder exists
 UPLOADS_DIR = Path(__file__).resolve().parent.parent / "uploads"
 UPLOADS_DIR.mkdir(exist_ok=True)
@@ -42,6 +46,16 @@ def speak(text: str, output_file: str = "stream_output.wav"):
     return audio_bytes
 
 
+def stream_speech(text: str, voice_id: str = "en-US-ken") -> Iterator[bytes]:
+    """Yields Murf audio chunks for the text as they are synthesized."""
+    client = Murf(api_key=MURF_API_KEY)
+    yield from client.text_to_speech.stream(
+        text=text,
+        voice_id=voice_id,
+        style="Conversational"
+    )
+
+
 def convert_text_to_speech(text: str, voice_id: str = "en-US-natalie") -> str:
     """Converts text to speech using Murf AI."""
     if not MURF_API_KEY:
@@ -54,7 +68,7 @@ def convert_text_to_speech(text: str, voice_id: str = "en-US-natalie") -> str:
         "format": "MP3",
         "volume": "100%"
     }
-    response = requests.post(f"{MURF_API_URL}/generate", json=payload, headers=headers)
+    response = _session.post(f"{MURF_API_URL}/generate", json=payload, headers=headers)
     response.raise_for_status()
     response_data = response.json()
     return response_data.get("audioFile")
@@ -66,6 +80,6 @@ def get_available_voices() -> List[Dict[str, Any]]:
         raise Exception("MURF_API_KEY not configured.")
 
     headers = {"Accept": "application/json", "api-key": MURF_API_KEY}
-    response = requests.get(f"{MURF_API_URL}/voices", headers=headers)
+    response = _session.get(f"{MURF_API_URL}/voices", headers=headers)
     response.raise_for_status()
     return response.json()
\ No newline at end of file
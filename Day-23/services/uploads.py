@@ -0,0 +1,15 @@
+# services/uploads.py
+import hashlib
+from pathlib import Path
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def save_upload(upload_file, path: Path, chunk_size: int = CHUNK_SIZE) -> str:
+    """Streams an UploadFile to disk, hashing it on the way; returns the SHA-256 hex digest."""
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        while chunk := upload_file.file.read(chunk_size):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
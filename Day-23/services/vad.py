@@ -0,0 +1,138 @@
+# services/vad.py
+import logging
+from collections import deque
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceActivityDetector:
+    """
+    Energy + zero-crossing voice activity gate for 16-bit mono PCM.
+
+    Feed every uplink chunk to `process()`; it returns the chunks that should
+    reach the STT provider:
+      - speech chunks, preceded by a short pre-roll of the audio just before
+        speech started (so the first syllable is never clipped)
+      - a hangover of trailing audio after speech ends, long enough for the
+        provider to see the silence it needs for end-of-turn
+      - a small silent keep-alive frame every `keepalive_ms` while gated,
+        so the provider session does not time out
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        window_ms: int = 10,
+        energy_threshold_db: float = -45.0,
+        zcr_threshold: float = 0.25,
+        fricative_margin_db: float = 6.0,
+        hangover_ms: int = 1000,
+        preroll_ms: int = 300,
+        keepalive_ms: int = 2000,
+        keepalive_frame_ms: int = 50,
+    ):
+        self.sample_rate = sample_rate
+        self.window = max(1, sample_rate * window_ms // 1000)
+        self.energy_threshold_db = energy_threshold_db
+        self.zcr_threshold = zcr_threshold
+        self.fricative_margin_db = fricative_margin_db
+        self.hangover_ms = hangover_ms
+        self.preroll_bytes = sample_rate * preroll_ms // 1000 * 2
+        self.keepalive_ms = keepalive_ms
+        self.keepalive_frame = bytes(sample_rate * keepalive_frame_ms // 1000 * 2)
+
+        self._preroll = deque()
+        self._preroll_size = 0
+        self._hangover_left_ms = 0.0
+        self._since_forward_ms = 0.0
+
+        # Stats, in bytes of real (client) audio
+        self.total_bytes = 0
+        self.forwarded_bytes = 0
+        self.keepalive_frames = 0
+
+    @property
+    def suppressed_bytes(self) -> int:
+        return self.total_bytes - self.forwarded_bytes
+
+    @property
+    def suppressed_ratio(self) -> float:
+        """Fraction of the uplink audio that never reached the provider."""
+        if not self.total_bytes:
+            return 0.0
+        return self.suppressed_bytes / self.total_bytes
+
+    def is_speech(self, chunk: bytes) -> bool:
+        """Returns True if any analysis window in the chunk looks like speech."""
+        samples = np.frombuffer(chunk, dtype="<i2", count=len(chunk) // 2)
+        if samples.size == 0:
+            return False
+
+        n_windows = samples.size // self.window
+        if n_windows:
+            frames = samples[: n_windows * self.window].reshape(n_windows, self.window)
+        else:
+            frames = samples.reshape(1, -1)
+        frames = frames.astype(np.float32) / 32768.0
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energy_db = 20.0 * np.log10(rms + 1e-10)
+
+        signs = np.signbit(frames)
+        crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+        zcr = crossings / max(1, frames.shape[1] - 1)
+
+        # High-ZCR windows (hiss, fricatives) need extra energy to count,
+        # which rejects broadband noise sitting just above the threshold.
+        loud = energy_db > self.energy_threshold_db
+        voiced = zcr < self.zcr_threshold
+        fricative = energy_db > self.energy_threshold_db + self.fricative_margin_db
+        return bool(np.any(loud & (voiced | fricative)))
+
+    def process(self, chunk: bytes) -> List[bytes]:
+        """Gates one uplink chunk and returns the frames to forward, in order."""
+        if not chunk:
+            return []
+
+        duration_ms = len(chunk) / 2 / self.sample_rate * 1000
+        self.total_bytes += len(chunk)
+
+        if self.is_speech(chunk):
+            self._hangover_left_ms = self.hangover_ms
+            out = list(self._preroll)
+            out.append(chunk)
+            self.forwarded_bytes += self._preroll_size + len(chunk)
+            self._preroll.clear()
+            self._preroll_size = 0
+            self._since_forward_ms = 0.0
+            return out
+
+        if self._hangover_left_ms > 0:
+            self._hangover_left_ms -= duration_ms
+            self.forwarded_bytes += len(chunk)
+            self._since_forward_ms = 0.0
+            return [chunk]
+
+        # Silence: hold the chunk in the pre-roll ring, dropping the oldest audio
+        self._preroll.append(chunk)
+        self._preroll_size += len(chunk)
+        while self._preroll and self._preroll_size - len(self._preroll[0]) >= self.preroll_bytes:
+            self._preroll_size -= len(self._preroll.popleft())
+
+        self._since_forward_ms += duration_ms
+        if self.keepalive_ms and self._since_forward_ms >= self.keepalive_ms:
+            self._since_forward_ms = 0.0
+            self.keepalive_frames += 1
+            return [self.keepalive_frame]
+        return []
+
+    def stats(self) -> dict:
+        return {
+            "total_seconds": self.total_bytes / 2 / self.sample_rate,
+            "forwarded_seconds": self.forwarded_bytes / 2 / self.sample_rate,
+            "suppressed_ratio": round(self.suppressed_ratio, 4),
+            "keepalive_frames": self.keepalive_frames,
+        }
@@ -0,0 +1,18 @@
+// static/mulaw.js
+// G.711 mu-law encoding, shared by the capture worklet (pcm-worklet.js) and
+// the ScriptProcessor fallback in script.js, so the two paths cannot drift.
+
+const MULAW_BIAS = 0x84;
+const MULAW_CLIP = 32635;
+
+// Encodes one 16-bit sample as one mu-law byte
+export const linearToMulaw = (sample) => {
+    const sign = sample < 0 ? 0x80 : 0;
+    let magnitude = Math.min(Math.abs(sample), MULAW_CLIP) + MULAW_BIAS;
+    let exponent = 7;
+    for (let mask = 0x4000; (magnitude & mask) === 0 && exponent > 0; mask >>= 1) {
+        exponent--;
+    }
+    const mantissa = (magnitude >> (exponent + 3)) & 0x0F;
+    return ~(sign | (exponent << 4) | mantissa) & 0xFF;
+};
@@ -0,0 +1,51 @@
+// static/pcm-worklet.js
+// Runs on the audio rendering thread: converts Float32 samples to 16-bit PCM
+// (or 8-bit mu-law when negotiated) and posts fixed-size frames to the main
+// thread as transferable buffers.
+import { linearToMulaw } from "./mulaw.js";
+
+class PCMCaptureProcessor extends AudioWorkletProcessor {
+    constructor(options) {
+        super();
+        const frameMs = (options.processorOptions && options.processorOptions.frameMs) || 20;
+        // `sampleRate` is the AudioContext rate, a global in the worklet scope
+        this.frameSize = Math.round(sampleRate * frameMs / 1000);
+        this.codec = "pcm16";
+        this.frame = this.newFrame();
+        this.offset = 0;
+        // The main thread switches codec once the server has negotiated one
+        this.port.onmessage = (e) => {
+            if (e.data && e.data.codec && e.data.codec !== this.codec) {
+                this.codec = e.data.codec;
+                this.frame = this.newFrame();
+                this.offset = 0;
+            }
+        };
+    }
+
+    newFrame() {
+        return this.codec === "mulaw" ? new Uint8Array(this.frameSize) : new Int16Array(this.frameSize);
+    }
+
+    process(inputs) {
+        const input = inputs[0];
+        if (input && input[0]) {
+            const channel = input[0];
+            const mulaw = this.codec === "mulaw";
+            for (let i = 0; i < channel.length; i++) {
+                const s = Math.max(-1, Math.min(1, channel[i]));
+                const pcm = s < 0 ? s * 32768 : s * 32767;
+                this.frame[this.offset++] = mulaw ? linearToMulaw(pcm | 0) : pcm;
+                if (this.offset === this.frameSize) {
+                    // Transfer ownership instead of copying, then start a fresh frame
+                    this.port.postMessage({ codec: this.codec, buffer: this.frame.buffer }, [this.frame.buffer]);
+                    this.frame = this.newFrame();
+                    this.offset = 0;
+                }
+            }
+        }
+        return true;
+    }
+}
+
+registerProcessor("pcm-capture", PCMCaptureProcessor);
@@ -1,4 +1,6 @@
 // static/script.js
+import { linearToMulaw } from "./mulaw.js";
+
 document.addEventListener("DOMContentLoaded", () => {
     const recordBtn = document.getElementById("recordBtn");
     const statusDisplay = document.getElementById("statusDisplay");
@@ -12,6 +14,15 @@ document.addEventListener("DOMContentLoaded", () => {
     let audioQueue = [];
     let isPlaying = false;
     let assistantMessageDiv = null;
+    const CAPTURE_FRAME_MS = 20; // Frame size posted by the AudioWorklet capture path
+    // Opt-in 8-bit mu-law uplink (half the bandwidth of PCM16): open the page with ?codec=mulaw
+    const REQUESTED_CODEC = new URLSearchParams(window.location.search).get("codec") === "mulaw" ? "mulaw" : "pcm16";
+    let uplinkCodec = "pcm16";
+
+    const setUplinkCodec = (codec) => {
+        uplinkCodec = codec;
+        if (processor && processor.port) processor.port.postMessage({ codec });
+    };
 
     const addOrUpdateMessage = (text, type) => {
         if (type === "assistant") {
@@ -51,32 +62,77 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     };
 
+    const sendPCM = (buffer) => {
+        if (ws && ws.readyState === WebSocket.OPEN) {
+            ws.send(buffer);
+        }
+    };
+
+    const startCapture = async (source) => {
+        // Preferred path: AudioWorklet converts to PCM off the main thread
+        if (audioContext.audioWorklet && window.AudioWorkletNode) {
+            try {
+                await audioContext.audioWorklet.addModule("/static/pcm-worklet.js");
+                processor = new AudioWorkletNode(audioContext, "pcm-capture", {
+                    numberOfInputs: 1,
+                    numberOfOutputs: 0,
+                    channelCount: 1,
+                    processorOptions: { frameMs: CAPTURE_FRAME_MS },
+                });
+                processor.port.onmessage = (e) => {
+                    // Drop frames encoded before a codec switch reached the worklet
+                    if (e.data.codec === uplinkCodec) sendPCM(e.data.buffer);
+                };
+                source.connect(processor);
+                return;
+            } catch (error) {
+                console.warn("AudioWorklet unavailable, falling back to ScriptProcessor:", error);
+            }
+        }
+
+        // Fallback for browsers without AudioWorklet support
+        processor = audioContext.createScriptProcessor(4096, 1, 1);
+        source.connect(processor);
+        processor.connect(audioContext.destination);
+        processor.onaudioprocess = (e) => {
+            const inputData = e.inputBuffer.getChannelData(0);
+            const mulaw = uplinkCodec === "mulaw";
+            const pcmData = mulaw ? new Uint8Array(inputData.length) : new Int16Array(inputData.length);
+            for (let i = 0; i < inputData.length; i++) {
+                const sample = Math.max(-1, Math.min(1, inputData[i])) * 32767;
+                pcmData[i] = mulaw ? linearToMulaw(sample | 0) : sample;
+            }
+            sendPCM(pcmData.buffer);
+        };
+    };
+
     const startRecording = async () => {
         try {
             mediaStream = await navigator.mediaDevices.getUserMedia({ audio: true });
             audioContext = new (window.AudioContext || window.webkitAudioContext)({ sampleRate: 16000 });
 
             const source = audioContext.createMediaStreamSource(mediaStream);
-            processor = audioContext.createScriptProcessor(4096, 1, 1);
-            source.connect(processor);
-            processor.connect(audioContext.destination);
-            processor.onaudioprocess = (e) => {
-                const inputData = e.inputBuffer.getChannelData(0);
-                const pcmData = new Int16Array(inputData.length);
-                for (let i = 0; i < inputData.length; i++) {
-                    pcmData[i] = Math.max(-1, Math.min(1, inputData[i])) * 32767;
-                }
-                if (ws && ws.readyState === WebSocket.OPEN) {
-                    ws.send(pcmData.buffer);
-                }
-            };
+            await startCapture(source);
 
             const wsProtocol = window.location.protocol === "https:" ? "wss:" : "ws:";
             ws = new WebSocket(`${wsProtocol}//${window.location.host}/ws`);
 
+            ws.onopen = () => {
+                // Declare the codec and the real capture rate (some browsers ignore the
+                // 16 kHz request); the server answers with what it will decode/resample,
+                // and capture keeps sending PCM16 until that answer arrives
+                ws.send(JSON.stringify({
+                    type: "config",
+                    codec: REQUESTED_CODEC,
+                    sample_rate: audioContext.sampleRate,
+                }));
+            };
+
             ws.onmessage = (event) => {
                 const msg = JSON.parse(event.data);
-                if (msg.type === "assistant") { // Changed from "llm" to "assistant"
+                if (msg.type === "config") {
+                    if (msg.codec !== uplinkCodec) setUplinkCodec(msg.codec);
+                } else if (msg.type === "assistant") { // Changed from "llm" to "assistant"
                     addOrUpdateMessage(msg.text, "assistant");
                 } else if (msg.type === "final") {
                     addOrUpdateMessage(msg.text, "user");
@@ -85,6 +141,20 @@ document.addEventListener("DOMContentLoaded", () => {
                     if (!isPlaying) {
                         playNextInQueue();
                     }
+                } else if (msg.type === "error") {
+                    // Rejected config (the server re-sends the config in force) or a failed STT stream
+                    console.error("Server error:", msg.message);
+                    statusDisplay.textContent = msg.message;
+                }
+            };
+
+            ws.onclose = (event) => {
+                // The server ends the session with 1011 when its STT stream fails; stop capturing
+                // but leave the error message on screen
+                if (isRecording && event.code === 1011) {
+                    const message = statusDisplay.textContent;
+                    stopRecording();
+                    statusDisplay.textContent = message;
                 }
             };
             isRecording = true;
@@ -97,7 +167,10 @@ document.addEventListener("DOMContentLoaded", () => {
     };
 
     const stopRecording = () => {
-        if (processor) processor.disconnect();
+        if (processor) {
+            if (processor.port) processor.port.onmessage = null;
+            processor.disconnect();
+        }
         if (mediaStream) mediaStream.getTracks().forEach(track => track.stop());
         if (ws) ws.close();
         